@@ -1,25 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from models import TokenData, User
+from cache import TTLCache
+from metrics import PASSWORD_HASH_LATENCY, PASSWORD_HASH_WAIT
 import os
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-change-in-production-2025")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", 64))
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Resolved users by token subject (email). Short TTL bounds how long an
+# out-of-band change (e.g. is_admin flipped in the shell) can go unnoticed;
+# the longer one applies while the users change stream is live.
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", 60))
+USER_CACHE_TTL_WATCHED = float(os.environ.get("USER_CACHE_TTL_WATCHED", 900))
+user_cache = TTLCache(
+    maxsize=int(os.environ.get("USER_CACHE_SIZE", 10000)),
+    ttl=USER_CACHE_TTL
+)
+
+# Fixed per deployment so every worker and host hashes at the same cost;
+# calibrate_bcrypt.py picks a value for the production hardware
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop. The semaphore caps concurrent hashes; callers beyond it wait in line.
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+hash_stats = {"in_flight": 0, "queued": 0, "max_queued": 0, "completed": 0, "rejected": 0, "rehashed": 0}
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def _hash_rounds(hashed_password: str) -> int:
+    # "$2b$12$<salt+checksum>"
+    return int(hashed_password.split("$")[2])
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    # Only ever upgrade; a host configured lower must not weaken stored hashes
+    if _hash_rounds(hashed_password) < BCRYPT_ROUNDS:
+        hash_stats["rehashed"] += 1
+        return True, pwd_context.hash(plain_password)
+    return True, None
+
+def _timed(operation: str, func, *args):
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        PASSWORD_HASH_LATENCY.observe(time.perf_counter() - started, operation)
+
+async def _run_hashing(operation: str, func, *args):
+    if hash_stats["queued"] >= PASSWORD_HASH_MAX_QUEUE:
+        hash_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again"
+        )
+    hash_stats["queued"] += 1
+    hash_stats["max_queued"] = max(hash_stats["max_queued"], hash_stats["queued"])
+    waiting = True
+    queued_at = time.perf_counter()
+    try:
+        async with _hash_slots:
+            hash_stats["queued"] -= 1
+            waiting = False
+            PASSWORD_HASH_WAIT.observe(time.perf_counter() - queued_at)
+            hash_stats["in_flight"] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(_hash_executor, _timed, operation, func, *args)
+            finally:
+                hash_stats["in_flight"] -= 1
+                hash_stats["completed"] += 1
+    finally:
+        if waiting:
+            hash_stats["queued"] -= 1
+
+async def hash_password(password: str) -> str:
+    return await _run_hashing("hash", get_password_hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a fresh hash when the stored
+    one was made with a lower cost than BCRYPT_ROUNDS."""
+    return await _run_hashing("verify", _verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -41,6 +124,12 @@ def verify_token(token: str, credentials_exception):
     except JWTError:
         raise credentials_exception
 
+def invalidate_user(email: Optional[str] = None):
+    if email is None:
+        user_cache.invalidate()
+    else:
+        user_cache.discard(email)
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db = None):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,10 +137,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db = None):
         headers={"WWW-Authenticate": "Bearer"},
     )
     token_data = verify_token(token, credentials_exception)
+    user = user_cache.get(token_data.email)
+    if user is not None:
+        return user
+    
     user = await db.users.find_one({"email": token_data.email})
     if user is None:
         raise credentials_exception
-    return User(**user)
+    user = User(**user)
+    user_cache.set(token_data.email, user)
+    return user
 
 async def get_current_admin_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_admin:
@@ -0,0 +1,232 @@
+from datetime import date, timedelta
+from itertools import groupby
+from typing import List, Optional
+
+from pymongo import ASCENDING, DeleteMany, UpdateOne
+
+# Slot inventory lives in its own collection, one document per
+# (experience, date, time, booking type), so experience documents stay small
+# no matter how far ahead availability is published.
+SLOT_KEY = ["experience_id", "date", "time", "bookingType"]
+SLOT_INDEX = [(field, ASCENDING) for field in SLOT_KEY]
+
+# Used for experiences that don't define their own slotTemplates
+DEFAULT_SLOT_TEMPLATES = [
+    {"time": "09:00", "bookingType": "private", "maxCapacity": 2},
+    {"time": "10:00", "bookingType": "shared", "maxCapacity": 5},
+    {"time": "14:00", "bookingType": "private", "maxCapacity": 2},
+    {"time": "15:00", "bookingType": "group", "maxCapacity": 3},
+]
+
+
+def _slot_key(experience_id: int, date: str, time: str, booking_type: str) -> dict:
+    return {
+        "experience_id": experience_id,
+        "date": date,
+        "time": time,
+        "bookingType": booking_type,
+    }
+
+def flatten_availability(experience_id: int, availability: List[dict]) -> List[dict]:
+    # Keyed like the slot_key index, so a date or slot listed twice becomes
+    # one document (the last one listed) instead of a duplicate key error
+    slots = {}
+    for day in availability:
+        for slot in day["timeSlots"]:
+            key = (day["date"], slot.get("time"), slot.get("bookingType"))
+            slots[key] = {"experience_id": experience_id, "date": day["date"], **slot}
+    return list(slots.values())
+
+async def ensure_slot_indexes(db):
+    await db.slots.create_index(SLOT_INDEX, unique=True, name="slot_key")
+
+async def get_availability(db, experience_id: int) -> List[dict]:
+    """Rebuild the DayAvailability shape the API has always returned."""
+    slots = await db.slots.find(
+        {"experience_id": experience_id},
+        {"_id": 0, "experience_id": 0}
+    ).sort(SLOT_INDEX[1:]).to_list(None)
+    return [
+        {"date": date, "timeSlots": [{k: v for k, v in slot.items() if k != "date"} for slot in day]}
+        for date, day in groupby(slots, key=lambda slot: slot["date"])
+    ]
+
+def _not_listed(slots: List[dict]) -> dict:
+    keys = [{"date": slot["date"], "time": slot["time"], "bookingType": slot["bookingType"]} for slot in slots]
+    return {"$nor": keys} if keys else {}
+
+async def find_booked_omissions(db, experience_id: int, availability: List[dict]) -> List[dict]:
+    """Booked slots that replace_slots(availability) would have to drop."""
+    return await db.slots.find(
+        {"experience_id": experience_id, "currentBookings": {"$gt": 0},
+         **_not_listed(flatten_availability(experience_id, availability))},
+        {"_id": 0, "date": 1, "time": 1, "bookingType": 1, "currentBookings": 1}
+    ).sort(SLOT_INDEX[1:]).to_list(None)
+
+async def replace_slots(db, experience_id: int, availability: List[dict]):
+    """Make ``availability`` the experience's complete set of published slots.
+
+    Listed slots are upserted, keeping their booked seats. Slots that are not
+    listed are deleted unless someone has booked them; callers that care
+    check find_booked_omissions first.
+    """
+    slots = flatten_availability(experience_id, availability)
+    operations = [
+        DeleteMany({
+            "experience_id": experience_id,
+            "currentBookings": {"$not": {"$gt": 0}},
+            **_not_listed(slots),
+        })
+    ]
+    for slot in slots:
+        operations.append(UpdateOne(
+            _slot_key(experience_id, slot["date"], slot["time"], slot["bookingType"]),
+            {
+                "$set": {"maxCapacity": slot["maxCapacity"], "available": slot.get("available", True)},
+                "$setOnInsert": {"currentBookings": slot.get("currentBookings", 0)},
+            },
+            upsert=True,
+        ))
+    await db.slots.bulk_write(operations, ordered=False)
+
+async def delete_slots(db, experience_id: int):
+    await db.slots.delete_many({"experience_id": experience_id})
+
+async def reserve_slot(db, experience_id: int, date: str, time: str, booking_type: str) -> bool:
+    """Take one seat in a slot with a single conditional update.
+
+    Returns False when the slot exists and is already full. Slots that are not
+    published for the experience are not tracked, so booking them always
+    succeeds (same as before).
+    """
+    key = _slot_key(experience_id, date, time, booking_type)
+    result = await db.slots.update_one(
+        {**key, "$expr": {"$lt": ["$currentBookings", "$maxCapacity"]}},
+        [{"$set": {
+            "currentBookings": {"$add": ["$currentBookings", 1]},
+            "available": {"$lt": [{"$add": ["$currentBookings", 1]}, "$maxCapacity"]},
+        }}],
+    )
+    if result.modified_count:
+        return True
+    # Only pay for the second lookup on the rejection path
+    return await db.slots.count_documents(key, limit=1) == 0
+
+async def release_slot(db, experience_id: int, date: str, time: str, booking_type: str) -> bool:
+    result = await db.slots.update_one(
+        {**_slot_key(experience_id, date, time, booking_type), "currentBookings": {"$gt": 0}},
+        {"$inc": {"currentBookings": -1}, "$set": {"available": True}},
+    )
+    return result.modified_count > 0
+
+async def roll_availability(db, horizon_days: int = 30, today: Optional[date] = None, batch_size: int = 1000) -> dict:
+    """Keep every experience published ``horizon_days`` ahead.
+
+    Prunes days before ``today`` and publishes, from each experience's
+    slotTemplates, only the days after the last one already rolled out (kept
+    in the experience's ``slotsPublishedThrough``). Days inside that range
+    that have no slots were closed by an admin and stay closed. Existing
+    slots are never touched ($setOnInsert), so live capacity survives
+    re-runs, and running it twice in a row is a no-op. Meant to be run
+    nightly (seed_availability.py).
+    """
+    today = today or date.today()
+    window = [(today + timedelta(days=i)).isoformat() for i in range(horizon_days)]
+    
+    pruned = await db.slots.delete_many({"date": {"$lt": window[0]}})
+    
+    # Experiences the roller hasn't seen yet count as published up to their
+    # last existing slot, so days already missing there aren't refilled
+    last_slot = {
+        group["_id"]: group["last"]
+        async for group in db.slots.aggregate([
+            {"$match": {"date": {"$gte": window[0]}}},
+            {"$group": {"_id": "$experience_id", "last": {"$max": "$date"}}}
+        ])
+    }
+    
+    inserted = 0
+    experiences = 0
+    operations = []
+    rolled = []
+    
+    async def flush():
+        nonlocal inserted, operations, rolled
+        if operations:
+            # Ordered, so an interrupted run leaves no holes; the next run
+            # simply picks up the days that are still missing.
+            result = await db.slots.bulk_write(operations, ordered=True)
+            inserted += result.upserted_count
+            operations = []
+        if rolled:
+            # Only once their slots are in, so a crash can't skip any days
+            await db.experiences.update_many(
+                {"id": {"$in": rolled}}, {"$max": {"slotsPublishedThrough": window[-1]}}
+            )
+            rolled = []
+    
+    async for experience in db.experiences.find({}, {"id": 1, "slotTemplates": 1, "slotsPublishedThrough": 1}):
+        experiences += 1
+        templates = experience.get("slotTemplates") or DEFAULT_SLOT_TEMPLATES
+        published_through = experience.get("slotsPublishedThrough") or last_slot.get(experience["id"], "")
+        days = [day for day in window if day > published_through]
+        if not days:
+            continue
+        for day in days:
+            for template in templates:
+                key = _slot_key(experience["id"], day, template["time"], template["bookingType"])
+                operations.append(UpdateOne(
+                    key,
+                    {"$setOnInsert": {
+                        "maxCapacity": template["maxCapacity"],
+                        "currentBookings": 0,
+                        "available": True,
+                    }},
+                    upsert=True,
+                ))
+        rolled.append(experience["id"])
+        # Per experience, so its days and its marker are written together
+        if len(operations) >= batch_size:
+            await flush()
+    await flush()
+    
+    return {"experiences": experiences, "inserted": inserted, "pruned": pruned.deleted_count}
+
+async def get_calendar(db, experience_id: int, start: date, end: date, booking_type: Optional[str] = None) -> dict:
+    """Remaining seats per slot for each day in [start, end].
+
+    Slots are columns shared by every day, so each day is just a list of
+    numbers (None where the slot isn't published that day). ``open`` is a
+    bitmap string over every date in the range, "1" when any seat is left.
+    """
+    query = {"experience_id": experience_id, "date": {"$gte": start.isoformat(), "$lte": end.isoformat()}}
+    if booking_type:
+        query["bookingType"] = booking_type
+    # Range scan on the slot_key index (experience_id, date, ...), already in date order
+    slots = await db.slots.find(
+        query, {"_id": 0, "date": 1, "time": 1, "bookingType": 1, "maxCapacity": 1, "currentBookings": 1, "available": 1}
+    ).sort(SLOT_INDEX).to_list(None)
+    
+    columns = sorted({(slot["time"], slot["bookingType"]) for slot in slots})
+    column_index = {column: i for i, column in enumerate(columns)}
+    days = []
+    for day, day_slots in groupby(slots, key=lambda slot: slot["date"]):
+        remaining = [None] * len(columns)
+        for slot in day_slots:
+            seats = max(0, slot["maxCapacity"] - slot["currentBookings"]) if slot.get("available", True) else 0
+            remaining[column_index[(slot["time"], slot["bookingType"])]] = seats
+        days.append({"date": day, "remaining": remaining})
+    
+    open_days = {day["date"] for day in days if any(day["remaining"])}
+    span = (end - start).days + 1
+    return {
+        "experience_id": experience_id,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "slots": [{"time": time, "bookingType": slot_type} for time, slot_type in columns],
+        "days": days,
+        "open": "".join(
+            "1" if (start + timedelta(days=i)).isoformat() in open_days else "0"
+            for i in range(span)
+        ),
+    }
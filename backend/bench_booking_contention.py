@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from availability import ensure_slot_indexes, reserve_slot, release_slot
+from database import make_client
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+client = make_client()
+# Use a throwaway database so the benchmark never touches real inventory
+db = client[os.environ['DB_NAME'] + "_bench"]
+
+EXPERIENCE_ID = 1
+DATE = "2030-01-01"
+TIME = "09:00"
+BOOKING_TYPE = "shared"
+
+
+async def read_slot():
+    return await db.slots.find_one({"experience_id": EXPERIENCE_ID})
+
+async def bench_booking_contention(requests: int, capacity: int):
+    print(f"Firing {requests} parallel bookings at one slot (capacity {capacity})...")
+
+    await ensure_slot_indexes(db)
+    await db.slots.delete_many({"experience_id": EXPERIENCE_ID})
+    await db.slots.insert_one({
+        "experience_id": EXPERIENCE_ID,
+        "date": DATE,
+        "time": TIME,
+        "bookingType": BOOKING_TYPE,
+        "maxCapacity": capacity,
+        "currentBookings": 0,
+        "available": True
+    })
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        reserve_slot(db, EXPERIENCE_ID, DATE, TIME, BOOKING_TYPE)
+        for _ in range(requests)
+    ])
+    elapsed = time.perf_counter() - started
+
+    reserved = sum(results)
+    slot = await read_slot()
+    print(f"✓ Reserve: {requests / elapsed:.0f} req/s, {reserved} accepted, "
+          f"{requests - reserved} rejected, slot at {slot['currentBookings']}/{capacity}")
+    assert reserved == min(requests, capacity), "accepted bookings do not match capacity"
+    assert slot["currentBookings"] == reserved, "slot counter drifted from accepted bookings"
+    assert slot["available"] == (reserved < capacity), "slot availability flag is wrong"
+
+    # Cancel every accepted booking plus some extra releases; the counter
+    # must settle at zero instead of going negative.
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        release_slot(db, EXPERIENCE_ID, DATE, TIME, BOOKING_TYPE)
+        for _ in range(reserved * 2)
+    ])
+    elapsed = time.perf_counter() - started
+
+    slot = await read_slot()
+    print(f"✓ Release: {reserved * 2 / elapsed:.0f} req/s, slot at {slot['currentBookings']}/{capacity}")
+    assert slot["currentBookings"] == 0, "slot counter did not return to zero"
+    assert slot["available"], "released slot is still marked unavailable"
+
+    await client.drop_database(db.name)
+    print("✅ Slot never exceeded capacity")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Booking contention benchmark")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(bench_booking_contention(args.requests, args.capacity))
+    client.close()
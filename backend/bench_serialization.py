@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models import Booking, Experience
+from serialization import BOOKING_LIST, EXPERIENCE_LIST, dump_models
+
+# Pure CPU benchmark: synthetic documents shaped like the seeded catalog, no
+# MongoDB needed.
+
+
+def make_experience(i: int) -> dict:
+    return {
+        "_id": f"oid-{i}",
+        "id": i,
+        "title": f"Heritage Walk {i} through Amaravati",
+        "category": ["Culinary", "Heritage", "Spiritual", "Nature"][i % 4],
+        "location": ["Vijayawada", "Guntur", "Amaravati"][i % 3],
+        "duration": "4 hours",
+        "price": 2500 + i,
+        "rating": 4.5,
+        "image": f"https://images.example.com/{i}/cover.jpg",
+        "featured": i % 5 == 0,
+        "description": "A slow morning through temples, markets and riverside ghats. " * 6,
+        "highlights": [f"Highlight {n}" for n in range(6)],
+        "whoIsThisFor": "Families, first-time visitors and photographers",
+        "included": [f"Included item {n}" for n in range(5)],
+        "images": [f"https://images.example.com/{i}/{n}.jpg" for n in range(6)],
+        "instagramReels": [
+            {"url": f"https://instagram.com/reel/{i}{n}", "embedUrl": f"https://instagram.com/reel/{i}{n}/embed"}
+            for n in range(2)
+        ],
+        "bookingTypes": ["private", "shared", "group"],
+        "pricing": {
+            "private": {"enabled": True, "firstAdult": 3600, "additionalAdult": 2200, "child": 1500},
+            "shared": {"enabled": True, "adult": 2500, "child": 1700},
+            "group": {
+                "enabled": True,
+                "tier1": {"min": 10, "max": 17, "pricePerPerson": 2200},
+                "tier2": {"min": 18, "max": 25, "pricePerPerson": 2000}
+            }
+        },
+        "addOns": [
+            {"id": f"addon-{n}", "name": f"Add-on {n}", "description": "Optional extra",
+             "price": 500, "calculationType": "flat", "active": True}
+            for n in range(4)
+        ],
+        "availability": [],
+    }
+
+def make_booking(i: int) -> dict:
+    return {
+        "_id": f"oid-{i}",
+        "id": f"BD{i:08d}",
+        "user_id": "user-id",
+        "experience_id": i % 50,
+        "experience_title": f"Heritage Walk {i % 50} through Amaravati",
+        "booking_type": "shared",
+        "date": "2030-01-01",
+        "time": "10:00",
+        "guests": {"adults": 2, "kids": 1},
+        "group_size": None,
+        "add_ons": {"pickup": True, "pickupLocation": "vijayawada", "specialPuja": 0, "souvenirKits": 2, "photography": False},
+        "customer_name": "Test Customer",
+        "customer_email": "customer@example.com",
+        "customer_phone": "9999999999",
+        "total_price": 7200.0,
+        "status": "confirmed",
+        "created_at": datetime(2030, 1, 1, 9, 30),
+        "updated_at": datetime(2030, 1, 1, 9, 30),
+    }
+
+async def old_path(model, documents: List[dict]) -> bytes:
+    # What the routes used to do: build models by hand, let FastAPI validate
+    # them again against response_model, jsonable_encoder, then json.dumps
+    field = create_response_field(name="response", type_=List[model])
+    models = [model(**document) for document in documents]
+    content = await serialize_response(field=field, response_content=models)
+    return JSONResponse(content).body
+
+def new_path(adapter, documents: List[dict]) -> bytes:
+    return dump_models(adapter, documents)
+
+def timed(fn, rounds: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1000
+
+def bench_serialization(size: int, rounds: int):
+    cases = [
+        ("/api/experiences", Experience, EXPERIENCE_LIST, [make_experience(i) for i in range(size)]),
+        ("/api/bookings", Booking, BOOKING_LIST, [make_booking(i) for i in range(size)]),
+    ]
+    print(f"Serializing {size} documents per response, {rounds} rounds...")
+    for route, model, adapter, documents in cases:
+        # serialize_response is a coroutine in FastAPI; run it on one loop
+        loop = asyncio.new_event_loop()
+        before = timed(lambda: loop.run_until_complete(old_path(model, documents)), rounds)
+        loop.close()
+        after = timed(lambda: new_path(adapter, documents), rounds)
+        print(f"✓ {route}: {before:.2f} ms -> {after:.2f} ms per response ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the old and new response serialization paths")
+    parser.add_argument("--size", type=int, default=200, help="documents per response")
+    parser.add_argument("--rounds", type=int, default=50, help="timed rounds per path")
+    args = parser.parse_args()
+    bench_serialization(args.size, args.rounds)
@@ -0,0 +1,37 @@
+import argparse
+import os
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+
+def calibrate_bcrypt_rounds(target_ms: float, samples: int = 3) -> int:
+    """Highest bcrypt cost whose median hash time stays within ``target_ms``."""
+    context = CryptContext(schemes=["bcrypt"])
+    best = MIN_BCRYPT_ROUNDS
+    for rounds in range(MIN_BCRYPT_ROUNDS, MAX_BCRYPT_ROUNDS + 1):
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            context.hash("calibration", rounds=rounds)
+            timings.append((time.perf_counter() - started) * 1000)
+        if statistics.median(timings) > target_ms:
+            break
+        best = rounds
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pick bcrypt rounds for a target hash latency. Run once on the "
+                    "production hardware and deploy the result as BCRYPT_ROUNDS."
+    )
+    parser.add_argument("--target-ms", type=float, default=float(os.environ.get("BCRYPT_TARGET_MS", 250)))
+    args = parser.parse_args()
+    
+    print(f"Calibrating bcrypt for {args.target_ms:.0f} ms per hash...")
+    rounds = calibrate_bcrypt_rounds(args.target_ms)
+    print(f"✅ Set BCRYPT_ROUNDS={rounds}")
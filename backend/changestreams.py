@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Standalone servers (and some proxies) can't open change streams at all
+UNSUPPORTED_CODES = {40573, 40324}
+# The resume token fell off the oplog or is unusable; start a fresh stream
+RESUME_FAILED_CODES = {260, 280, 286}
+RETRY_DELAY = 5
+
+
+class ChangeStreamWatcher:
+    """Tails one collection's change stream for the life of the worker.
+
+    ``on_change`` gets every event. ``on_live(True)`` fires once the stream
+    is open and ``on_live(False)`` whenever it drops, so callers can lean on
+    the stream while it's up and fall back to plain TTL expiry otherwise.
+    The resume token is kept across reconnects, so a network blip doesn't
+    lose events. Changes made before the stream opened are never delivered,
+    so ``on_live(True)`` is also the caller's cue to drop what it cached.
+    """
+
+    def __init__(
+        self,
+        collection,
+        on_change: Callable[[dict], Awaitable[None]],
+        on_live: Callable[[bool], Awaitable[None]],
+        pipeline: Optional[List[dict]] = None,
+        full_document: Optional[str] = None,
+    ):
+        self.collection = collection
+        self.on_change = on_change
+        self.on_live = on_live
+        self.pipeline = pipeline or []
+        self.full_document = full_document
+        self.resume_token = None
+        self.live = False
+        self.supported = True
+        self.events = 0
+        self.restarts = 0
+
+    async def _set_live(self, live: bool):
+        if live != self.live:
+            self.live = live
+            await self.on_live(live)
+
+    async def run(self):
+        name = self.collection.name
+        while True:
+            try:
+                async with self.collection.watch(
+                    self.pipeline, full_document=self.full_document, resume_after=self.resume_token
+                ) as stream:
+                    await self._set_live(True)
+                    async for change in stream:
+                        # Advance first: if the handler fails, on_live(False)
+                        # clears the caches, so replaying the event buys nothing
+                        self.resume_token = stream.resume_token
+                        self.events += 1
+                        await self.on_change(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in UNSUPPORTED_CODES:
+                    self.supported = False
+                else:
+                    if e.code in RESUME_FAILED_CODES:
+                        self.resume_token = None
+                    logger.warning(f"Change stream on {name} failed: {e}")
+            except PyMongoError as e:
+                logger.warning(f"Change stream on {name} interrupted: {e}")
+            except Exception:
+                # A handler bug must not kill invalidation for good
+                logger.exception(f"Change stream handler for {name} failed")
+
+            await self._set_live(False)
+            if not self.supported:
+                logger.info(f"Change streams unavailable on {name}; caches fall back to TTL expiry")
+                return
+            self.restarts += 1
+            await asyncio.sleep(RETRY_DELAY)
+
+    def stats(self) -> dict:
+        return {
+            "live": self.live,
+            "supported": self.supported,
+            "events": self.events,
+            "restarts": self.restarts,
+        }
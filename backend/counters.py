@@ -0,0 +1,26 @@
+from pymongo import ReturnDocument
+
+
+async def allocate_ids(db, name: str, count: int = 1) -> int:
+    """Reserve ``count`` consecutive ids and return the first one.
+
+    A single atomic $inc, so concurrent callers always get disjoint blocks.
+    """
+    counter = await db.counters.find_one_and_update(
+        {"_id": name},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"] - count + 1
+
+async def sync_counter(db, name: str, collection: str, field: str = "id"):
+    # Move the counter past ids that were written without it (seed data, old
+    # max+1 allocations). $max never moves it backwards.
+    latest = await db[collection].find_one({}, {field: 1}, sort=[(field, -1)])
+    if latest:
+        await db.counters.update_one(
+            {"_id": name},
+            {"$max": {"seq": latest[field]}},
+            upsert=True
+        )
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+def client_options() -> dict:
+    """Driver settings from the environment. Anything left unset keeps the
+    pymongo default."""
+    options = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS"),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+        "socketTimeoutMS": _env_int("MONGO_SOCKET_TIMEOUT_MS"),
+        "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        # e.g. "zstd,snappy,zlib"; zstd and snappy need their python packages
+        "compressors": os.environ.get("MONGO_COMPRESSORS"),
+    }
+    return {name: value for name, value in options.items() if value is not None}
+
+def make_client(**overrides) -> AsyncIOMotorClient:
+    """The one place a Mongo client gets built, for the API and the scripts."""
+    return AsyncIOMotorClient(os.environ["MONGO_URL"], **{**client_options(), **overrides})
+
+def get_db(client: AsyncIOMotorClient, read_preference=None):
+    return client.get_database(os.environ["DB_NAME"], read_preference=read_preference)
+
+def catalog_read_preference():
+    """CATALOG_READ_PREFERENCE (e.g. "secondaryPreferred") for catalog reads,
+    bounded by CATALOG_MAX_STALENESS_SECONDS when set. None means primary.
+
+    Secondary reads can trail admin edits by the replication lag, and the
+    catalog cache may hold on to such a read until its TTL.
+    """
+    mode = os.environ.get("CATALOG_READ_PREFERENCE")
+    if not mode:
+        return None
+    return make_read_preference(
+        read_pref_mode_from_name(mode), None,
+        max_staleness=_env_int("CATALOG_MAX_STALENESS_SECONDS") or -1
+    )
+
+async def ping(client: AsyncIOMotorClient, timeout: Optional[float] = None):
+    await asyncio.wait_for(client.admin.command("ping"), timeout)
+
+async def warm_up(client: AsyncIOMotorClient, connections: int) -> float:
+    """Ping once, then open ``connections`` pooled sockets with concurrent
+    pings, so the first user requests don't pay for TCP/TLS/auth setup.
+    Returns the elapsed seconds."""
+    started = time.perf_counter()
+    await ping(client)
+    # Each in-flight command checks out its own connection
+    await asyncio.gather(*[ping(client) for _ in range(max(connections - 1, 0))])
+    return time.perf_counter() - started
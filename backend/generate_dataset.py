@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from auth import get_password_hash
+from availability import DEFAULT_SLOT_TEMPLATES, ensure_slot_indexes
+from counters import sync_counter
+from database import make_client
+from indexes import ensure_indexes
+from loadtest import ADMIN_EMAIL, PASSWORD
+from models import AddOn, AddOns, Booking, Experience, NewsletterSubscriber, PricingStructure, Slot, UserInDB
+from pricing import DEFAULT_ADD_ONS, price_grid
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Deterministic: the same --seed on the same day produces the same documents
+# (apart from Mongo's _id), however the inserts interleave. Accounts match
+# loadtest.py, so `loadtest.py --no-seed` can run against the result.
+
+# (value, weight) pairs, roughly what the live catalog looks like
+CATEGORIES = [
+    ("Temples & Spirituality", 30), ("Heritage", 25), ("Handlooms & Handicrafts", 15),
+    ("Culinary", 15), ("Nature", 15),
+]
+LOCATIONS = [
+    ("Amaravati – Vijayawada", 30), ("Tirupati", 15), ("Vizag", 12), ("Mangalagiri – Guntur District", 8),
+    ("Srisailam", 6), ("Araku Valley", 6), ("Rajahmundry", 5), ("Kurnool", 4), ("Nellore", 4),
+    ("Kakinada", 4), ("Lepakshi", 3), ("Kondapalli", 3),
+]
+# Median display price per category
+BASE_PRICES = {
+    "Temples & Spirituality": 2200, "Heritage": 2800, "Handlooms & Handicrafts": 2500,
+    "Culinary": 3200, "Nature": 3600,
+}
+TITLE_WORDS = {
+    "Temples & Spirituality": ["Temple", "Darshan", "Aarti", "Pilgrim", "Sacred"],
+    "Heritage": ["Heritage", "Fort", "Buddhist", "Stupa", "Royal"],
+    "Handlooms & Handicrafts": ["Handloom", "Kalamkari", "Weaving", "Toy Makers", "Artisans"],
+    "Culinary": ["Spice", "Andhra Thali", "Street Food", "Pickle", "Cooking"],
+    "Nature": ["River", "Sunrise", "Hill", "Coffee Estate", "Backwater"],
+}
+TITLE_FORMATS = ["{word} Trail", "{word} Walk", "{word} Experience", "{word} Morning", "{word} Immersion"]
+FIRST_NAMES = ["Aarav", "Divya", "Karthik", "Lakshmi", "Ravi", "Sita", "Arjun", "Priya", "Vikram", "Anjali",
+               "Sai", "Keerthi", "Rahul", "Meera", "Suresh", "Ananya", "Emma", "Liam", "Noah", "Olivia"]
+LAST_NAMES = ["Reddy", "Rao", "Naidu", "Sharma", "Varma", "Chowdary", "Iyer", "Kumar", "Gupta", "Smith"]
+# Alternatives to DEFAULT_SLOT_TEMPLATES; all keep the 10:00 shared slot loadtest.py books
+SLOT_TEMPLATE_SETS = [
+    (DEFAULT_SLOT_TEMPLATES, 70),
+    ([{"time": "06:00", "bookingType": "private", "maxCapacity": 2},
+      {"time": "10:00", "bookingType": "shared", "maxCapacity": 8}], 15),
+    ([{"time": "10:00", "bookingType": "shared", "maxCapacity": 12},
+      {"time": "16:00", "bookingType": "shared", "maxCapacity": 12},
+      {"time": "11:00", "bookingType": "group", "maxCapacity": 2}], 15),
+]
+BOOKING_TYPE_WEIGHTS = {"private": 35, "shared": 50, "group": 15}
+BOOKING_HISTORY_DAYS = 365
+COLLECTIONS = ["experiences", "slots", "users", "bookings", "newsletter_subscribers", "counters"]
+
+
+def _choice(rng: random.Random, pairs):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights)[0]
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def _popular(rng: random.Random, count: int, skew: float) -> int:
+    # Skewed towards low indexes: a few experiences/users account for most bookings
+    return int(count * rng.random() ** skew)
+
+
+class Progress:
+    def __init__(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.written = 0
+        self.started = time.perf_counter()
+
+    def advance(self, count: int):
+        self.written += count
+        elapsed = time.perf_counter() - self.started
+        rate = self.written / elapsed if elapsed else 0
+        sys.stdout.write(
+            f"\r  {self.label}: {self.written:,}/{self.total:,} "
+            f"({self.written * 100 // max(self.total, 1)}%) {rate:,.0f} docs/s"
+        )
+        sys.stdout.flush()
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started
+        sys.stdout.write(f"\r✓ {self.label}: {self.written:,} documents in {elapsed:.1f}s{' ' * 20}\n")
+
+
+class DatasetGenerator:
+    def __init__(self, db, seed: int, batch_size: int, parallel: int):
+        self.db = db
+        self.seed = seed
+        self.batch_size = batch_size
+        self.parallel = parallel
+        self.today = date.today()
+        # Midnight rather than utcnow(), so timestamps don't drift between runs
+        self.now = datetime.combine(self.today, datetime.min.time())
+        # Filled as collections are generated; later collections refer back
+        self.experiences = []  # (id, title, bookingTypes, slotTemplates)
+        self.users = []  # (id, name, email, phone)
+
+    def _rng(self, collection: str, batch: int) -> random.Random:
+        # One stream per batch, so batches don't depend on each other
+        return random.Random(f"{self.seed}:{collection}:{batch}")
+
+    async def _write(self, collection: str, total: int, make_batch, model, units_per_batch=None, documents=None):
+        """Generate ``total`` units batch by batch, with up to ``parallel``
+        unordered insert_many calls in flight. A unit is one document unless
+        the collection says otherwise (slots: one experience's window), in
+        which case ``documents`` is the expected document count."""
+        batch_size = units_per_batch or self.batch_size
+        progress = Progress(collection, total if documents is None else documents)
+        slots = asyncio.Semaphore(self.parallel)
+        pending = set()
+
+        async def insert(documents):
+            try:
+                await self.db[collection].insert_many(documents, ordered=False)
+                progress.advance(len(documents))
+            finally:
+                slots.release()
+
+        for batch, start in enumerate(range(0, total, batch_size)):
+            await slots.acquire()
+            generated = make_batch(self._rng(collection, batch), start, min(batch_size, total - start))
+            # Spot-check one document per batch against the API's model
+            model(**generated[0])
+            task = asyncio.create_task(insert(generated))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        await asyncio.gather(*pending)
+        progress.finish()
+
+    # ============ EXPERIENCES ============
+
+    def _experience(self, rng: random.Random, experience_id: int) -> dict:
+        category = _choice(rng, CATEGORIES)
+        location = _choice(rng, LOCATIONS)
+        word = rng.choice(TITLE_WORDS[category])
+        title = f"{rng.choice(TITLE_FORMATS).format(word=word)} – {location.split(' – ')[0]} {experience_id}"
+        price = int(min(12000, max(800, rng.lognormvariate(0, 0.35) * BASE_PRICES[category])) // 100 * 100)
+        booking_types = ["private", "shared", "group"] if rng.random() < 0.7 else sorted(
+            rng.sample(["private", "shared", "group"], rng.randint(1, 2))
+        )
+        slot_templates = _choice(rng, SLOT_TEMPLATE_SETS)
+        self.experiences.append((experience_id, title, booking_types, slot_templates))
+        return {
+            "id": experience_id,
+            "title": title,
+            "category": category,
+            "location": location,
+            "duration": rng.choice(["2 hours", "3 hours", "4 hours", "Half day", "Full day"]),
+            "price": price,
+            "rating": round(min(5.0, 3.5 + rng.betavariate(5, 2) * 1.5), 1),
+            "image": f"https://images.example.com/experiences/{experience_id}/cover.jpg",
+            "featured": rng.random() < 0.03,
+            "description": f"{title} takes you through the {word.lower()} traditions of {location}. " * 4,
+            "highlights": [f"{word} {detail}" for detail in rng.sample(
+                ["with a local guide", "at golden hour", "off the tourist trail", "tasting session", "artisan visit"], 3
+            )],
+            "whoIsThisFor": rng.choice(["Families", "Solo travellers", "Photographers", "Pilgrims", "Food lovers"]),
+            "included": rng.sample(["Guide", "Water", "Snacks", "Entry tickets", "Transport", "Lunch"], 3),
+            "images": [f"https://images.example.com/experiences/{experience_id}/{n}.jpg" for n in range(5)],
+            "instagramReels": [],
+            "bookingTypes": booking_types,
+            "pricing": PricingStructure().dict(),
+            "addOns": DEFAULT_ADD_ONS,
+            "slotTemplates": slot_templates,
+        }
+
+    def _experience_batch(self, rng: random.Random, start: int, count: int):
+        return [self._experience(rng, start + offset + 1) for offset in range(count)]
+
+    def _slot_batch(self, rng: random.Random, start: int, count: int):
+        # One batch unit is one experience's whole window
+        slots = []
+        for experience_id, _, _, slot_templates in self.experiences[start:start + count]:
+            popularity = 1 - (experience_id - 1) / len(self.experiences)
+            for offset in range(self.horizon):
+                day = (self.today + timedelta(days=offset)).isoformat()
+                # Near dates and popular experiences fill up first
+                fill = popularity * max(0.0, 1 - offset / self.horizon) * rng.random()
+                for template in slot_templates:
+                    booked = min(template["maxCapacity"], int(round(template["maxCapacity"] * fill * 1.5)))
+                    slots.append({
+                        "experience_id": experience_id,
+                        "date": day,
+                        "time": template["time"],
+                        "bookingType": template["bookingType"],
+                        "maxCapacity": template["maxCapacity"],
+                        "currentBookings": booked,
+                        "available": booked < template["maxCapacity"],
+                    })
+        return slots
+
+    # ============ USERS ============
+
+    def _user_batch(self, rng: random.Random, start: int, count: int):
+        users = []
+        for n in range(start, start + count):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            user = {
+                "id": _uuid(rng),
+                "email": f"user{n}@loadtest.example.com",
+                "name": name,
+                "phone": f"{rng.randint(6, 9)}{rng.randrange(10 ** 9):09d}",
+                # Sign-ups accelerate over two years
+                "created_at": self.now - timedelta(days=730 * rng.random() ** 0.5, seconds=rng.randrange(86400)),
+                "is_admin": False,
+                "hashed_password": self.password_hash,
+            }
+            self.users.append((user["id"], user["name"], user["email"], user["phone"]))
+            users.append(user)
+        return users
+
+    # ============ BOOKINGS ============
+
+    def _booking_batch(self, rng: random.Random, start: int, count: int):
+        bookings = []
+        grid = []
+        for n in range(start, start + count):
+            experience_id, title, booking_types, slot_templates = self.experiences[_popular(rng, len(self.experiences), 2)]
+            user_id, name, email, phone = self.users[_popular(rng, len(self.users), 1.5)]
+            booking_type = rng.choices(booking_types, [BOOKING_TYPE_WEIGHTS[t] for t in booking_types])[0]
+            times = [t["time"] for t in slot_templates if t["bookingType"] == booking_type] or ["10:00"]
+            adults = rng.choices([1, 2, 3, 4, 5, 6], [15, 45, 15, 15, 5, 5])[0]
+            kids = rng.choices([0, 1, 2, 3], [55, 25, 15, 5])[0]
+            group_size = rng.randint(10, 25) if booking_type == "group" else None
+            add_ons = AddOns(
+                pickup=rng.random() < 0.3,
+                pickupLocation=rng.choice(["vijayawada", "guntur"]),
+                specialPuja=rng.choice([0, 0, 0, 1, 2]),
+                souvenirKits=rng.choice([0, 1, 1, 2]),
+                photography=rng.random() < 0.2,
+            )
+            if not add_ons.pickup:
+                add_ons.pickupLocation = ""
+            # Bookings made over the last year, for dates a few days to weeks out
+            created_at = self.now - timedelta(days=BOOKING_HISTORY_DAYS * rng.random(), seconds=rng.randrange(86400))
+            booked_for = created_at.date() + timedelta(days=int(rng.expovariate(1 / 14)) + 1)
+            if booked_for < self.today:
+                status = rng.choices(["completed", "cancelled", "confirmed"], [85, 12, 3])[0]
+            else:
+                status = rng.choices(["confirmed", "cancelled"], [88, 12])[0]
+            grid.append((booking_type, adults, kids, group_size, add_ons))
+            bookings.append({
+                # Sequential, so millions of ids never collide
+                "id": f"BD{n:08X}",
+                "user_id": user_id,
+                "experience_id": experience_id,
+                "experience_title": title,
+                "booking_type": booking_type,
+                "date": booked_for.isoformat(),
+                "time": rng.choice(times),
+                "guests": {"adults": adults, "kids": kids},
+                "group_size": group_size,
+                "add_ons": add_ons.dict(),
+                "customer_name": name,
+                "customer_email": email,
+                "customer_phone": phone,
+                "status": status,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        # Priced like the booking widget, in one vectorized pass per batch
+        base, extras = price_grid(self.pricing, self.add_ons, grid)
+        for booking, total in zip(bookings, (base + extras).tolist()):
+            booking["total_price"] = float(total)
+        return bookings
+
+    # ============ NEWSLETTER ============
+
+    def _subscriber_batch(self, rng: random.Random, start: int, count: int):
+        return [
+            {
+                "id": _uuid(rng),
+                "email": f"subscriber{n}@loadtest.example.com",
+                "subscribed_at": self.now - timedelta(days=730 * rng.random()),
+                "status": "active" if rng.random() < 0.9 else "unsubscribed",
+            }
+            for n in range(start, start + count)
+        ]
+
+    async def generate(self, experiences: int, users: int, bookings: int, subscribers: int, horizon: int):
+        self.horizon = horizon
+        self.pricing = PricingStructure()
+        self.add_ons = [AddOn(**addon) for addon in DEFAULT_ADD_ONS]
+        # One bcrypt for everyone; every account logs in with loadtest.PASSWORD
+        self.password_hash = get_password_hash(PASSWORD)
+
+        await self._write("experiences", experiences, self._experience_batch, Experience)
+        # Slot batches are whole experiences, sized to roughly --batch-size documents
+        slot_count = horizon * sum(len(templates) for _, _, _, templates in self.experiences)
+        per_batch = max(1, self.batch_size * experiences // max(slot_count, 1))
+        await self._write("slots", experiences, self._slot_batch, Slot, per_batch, slot_count)
+        await self._write("users", users, self._user_batch, UserInDB)
+        await self.db.users.insert_one({
+            "id": "admin", "email": ADMIN_EMAIL, "name": "Admin", "phone": "9999999999",
+            "created_at": self.now, "is_admin": True, "hashed_password": self.password_hash,
+        })
+        await self._write("bookings", bookings, self._booking_batch, Booking)
+        await self._write("newsletter_subscribers", subscribers, self._subscriber_batch, NewsletterSubscriber)
+
+
+
+async def main(args):
+    default_db = os.environ.get("DB_NAME", "andhra_darsan") + "_loadtest"
+    db_name = args.db or default_db
+    if db_name == os.environ.get("DB_NAME") and not args.force:
+        raise SystemExit(f"Refusing to overwrite {db_name}; pass --force if you really mean it")
+
+    client = make_client()
+    db = client[db_name]
+    print(f"Generating into {db_name} (seed {args.seed}, batches of {args.batch_size}, {args.parallel} in flight)...")
+    for collection in COLLECTIONS:
+        await db[collection].drop()
+
+    started = time.perf_counter()
+    generator = DatasetGenerator(db, args.seed, args.batch_size, args.parallel)
+    await generator.generate(args.experiences, args.users, args.bookings, args.subscribers, args.horizon)
+
+    # Indexes last: building them once is much faster than maintaining them per insert
+    print("Building indexes...")
+    await ensure_indexes(db)
+    await ensure_slot_indexes(db)
+    await sync_counter(db, "experiences", "experiences")
+    print(f"✅ Dataset ready in {time.perf_counter() - started:.0f}s")
+    client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a large, deterministic dataset for performance testing")
+    parser.add_argument("--experiences", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--bookings", type=int, default=5000000)
+    parser.add_argument("--subscribers", type=int, default=100000)
+    parser.add_argument("--horizon", type=int, default=30, help="days of published slots per experience")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000, help="documents per insert_many")
+    parser.add_argument("--parallel", type=int, default=8, help="insert_many calls in flight")
+    parser.add_argument("--db", help="target database (default: DB_NAME + '_loadtest')")
+    parser.add_argument("--force", action="store_true", help="allow --db to be the application database")
+    asyncio.run(main(parser.parse_args()))
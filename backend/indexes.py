@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from availability import SLOT_INDEX
+from database import get_db, make_client
+
+logger = logging.getLogger(__name__)
+
+# (collection, keys, options). Unique wherever server.py treats a field as
+# an identity and looks it up with find_one.
+INDEXES = [
+    ("users", [("email", ASCENDING)], {"unique": True}),
+    ("experiences", [("id", ASCENDING)], {"unique": True}),
+    ("experiences", [("category", ASCENDING), ("location", ASCENDING)], {}),
+    ("bookings", [("id", ASCENDING)], {"unique": True}),
+    ("bookings", [("user_id", ASCENDING), ("created_at", DESCENDING)], {}),
+    # Admin listing/export: every filter combination, sorted newest first
+    ("bookings", [("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("bookings", [("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("bookings", [("experience_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("bookings", [("status", ASCENDING), ("experience_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("newsletter_subscribers", [("email", ASCENDING)], {"unique": True}),
+    # Active-subscriber listing and campaign dispatch, which pages by email
+    ("newsletter_subscribers", [("status", ASCENDING), ("email", ASCENDING)], {}),
+    ("newsletter_campaigns", [("id", ASCENDING)], {"unique": True}),
+    ("slots", SLOT_INDEX, {"unique": True, "name": "slot_key"}),
+    # Rolling-window pruning and per-day scans across all experiences
+    ("slots", [("date", ASCENDING)], {}),
+]
+
+# (collection, filter, sort) for the queries on the request path
+HOT_QUERIES = [
+    ("users", {"email": "user@example.com"}, None),
+    ("experiences", {"id": 1}, None),
+    ("experiences", {"category": "Culinary"}, [("id", ASCENDING)]),
+    ("bookings", {"id": "BD00000000"}, None),
+    ("bookings", {"user_id": "user-id"}, None),
+    ("bookings", {}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("bookings", {"status": "confirmed"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("bookings", {"experience_id": 1}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("bookings", {"status": "confirmed", "experience_id": 1}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("newsletter_subscribers", {"email": "user@example.com"}, None),
+    ("newsletter_subscribers", {"status": "active"}, None),
+    ("newsletter_subscribers", {"status": "active", "email": {"$gt": ""}}, [("email", ASCENDING)]),
+    ("slots", {"experience_id": 1, "date": "2030-01-01", "time": "09:00", "bookingType": "private"}, None),
+]
+
+
+async def ensure_indexes(db):
+    for collection, keys, options in INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            # Typically duplicates blocking a unique index; keep serving and
+            # leave the data cleanup to a human.
+            logger.error(f"Could not create index {keys} on {collection}: {e}")
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            yield from _plan_stages(child)
+
+async def find_collection_scans(db):
+    """Explain every hot query and return the ones still planned as COLLSCAN."""
+    scans = []
+    for collection, query, sort in HOT_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        # Newer servers wrap the classic plan in "queryPlan"
+        winning_plan = winning_plan.get("queryPlan", winning_plan)
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            scans.append((collection, query, sort))
+    return scans
+
+async def main(verify: bool):
+    ROOT_DIR = Path(__file__).parent
+    load_dotenv(ROOT_DIR / '.env')
+    client = make_client()
+    db = get_db(client)
+
+    print("Creating indexes...")
+    await ensure_indexes(db)
+    for collection, keys, options in INDEXES:
+        print(f"✓ {collection}: {keys}{' (unique)' if options.get('unique') else ''}")
+
+    if verify:
+        print("Explaining hot queries...")
+        scans = await find_collection_scans(db)
+        for collection, query, sort in scans:
+            print(f"✗ COLLSCAN on {collection}: {query} sort={sort}")
+        if not scans:
+            print("✅ Every hot query is index-backed")
+
+    client.close()
+    return not verify or not scans
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and verify MongoDB indexes")
+    parser.add_argument("--verify", action="store_true", help="explain hot queries and report collection scans")
+    args = parser.parse_args()
+    raise SystemExit(0 if asyncio.run(main(args.verify)) else 1)
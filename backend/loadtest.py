@@ -0,0 +1,337 @@
+"""Load generator for the API.
+
+Virtual users loop over weighted scenarios until the time runs out, and
+every request is timed per endpoint template. Three ways to run it:
+
+    python loadtest.py                      # in-process app, local mongod (MONGO_URL)
+    python loadtest.py --in-memory          # in-process app, mongomock-motor
+    python loadtest.py --base-url http://localhost:8001
+                                            # a running server on the same MONGO_URL
+
+Test data goes into DB_NAME + "_loadtest", never the real database; start
+the server with that DB_NAME when using --base-url. In-process runs share
+one event loop between the generator and the app, so compare numbers run
+against run rather than against production.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+PASSWORD = "loadtest-password"
+ADMIN_EMAIL = "admin@loadtest.example.com"
+HORIZON_DAYS = 14
+IN_MEMORY_BOOKINGS = 2000
+# Everyone in the booking scenario fights over this one slot
+HOT_SLOT = {"experience_id": 1, "time": "10:00", "booking_type": "shared"}
+SEARCH_TERMS = ["heritage", "temple", "handloom", "river", "kalamkari", "spice", "village"]
+CATEGORIES = ["Heritage", "Spiritual", "Culinary", "Handlooms & Handicrafts", "Nature"]
+LOCATIONS = ["Vijayawada", "Guntur", "Amaravati", "Mangalagiri", "Kondapalli"]
+
+
+# ============ DATA ============
+
+def make_experience(i: int) -> dict:
+    words = random.sample(SEARCH_TERMS, 3)
+    return {
+        "id": i,
+        "title": f"{words[0].title()} {words[1].title()} Trail {i}",
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "location": LOCATIONS[i % len(LOCATIONS)],
+        "duration": "4 hours",
+        "price": random.randrange(1000, 6000, 100),
+        "rating": round(random.uniform(4.0, 5.0), 1),
+        "image": f"https://images.example.com/{i}.jpg",
+        "featured": i % 4 == 0,
+        "description": f"A walk through {' and '.join(words)} stories. " * 5,
+        "highlights": [f"{word.title()} stop" for word in words],
+        "whoIsThisFor": "Curious travellers",
+        "included": ["Guide", "Water"],
+        "images": [f"https://images.example.com/{i}/{n}.jpg" for n in range(4)],
+        "instagramReels": [],
+        "bookingTypes": ["private", "shared", "group"],
+        "addOns": [],
+    }
+
+async def seed(db, experiences: int, users: int, bookings: int):
+    from auth import get_password_hash
+    from availability import ensure_slot_indexes, roll_availability
+    from indexes import ensure_indexes
+    from models import PricingStructure
+
+    print(f"Seeding {experiences} experiences, {users} users, {bookings} bookings...")
+    for collection in ("experiences", "users", "bookings", "slots", "counters"):
+        await db[collection].delete_many({})
+
+    pricing = PricingStructure().model_dump()
+    await db.experiences.insert_many([
+        {**make_experience(i), "pricing": pricing} for i in range(1, experiences + 1)
+    ])
+    await roll_availability(db, horizon_days=HORIZON_DAYS)
+
+    # One bcrypt for everyone; logins still pay for a verify each
+    hashed = get_password_hash(PASSWORD)
+    now = datetime.utcnow()
+    user_docs = [
+        {"id": f"user-{n}", "email": f"user{n}@loadtest.example.com", "name": f"User {n}", "phone": "9999999999",
+         "created_at": now, "is_admin": False, "hashed_password": hashed}
+        for n in range(users)
+    ]
+    user_docs.append({"id": "admin", "email": ADMIN_EMAIL, "name": "Admin", "phone": "9999999999",
+                      "created_at": now, "is_admin": True, "hashed_password": hashed})
+    await db.users.insert_many(user_docs)
+
+    statuses = ["confirmed"] * 8 + ["cancelled", "completed"]
+    batch = []
+    for n in range(bookings):
+        user = user_docs[n % users]
+        experience_id = n % experiences + 1
+        batch.append({
+            "id": f"LT{n:08d}", "user_id": user["id"], "experience_id": experience_id,
+            "experience_title": f"Experience {experience_id}", "booking_type": "shared",
+            "date": (date.today() - timedelta(days=n % 365)).isoformat(), "time": "10:00",
+            "guests": {"adults": 2, "kids": 0}, "group_size": None, "add_ons": {},
+            "customer_name": user["name"], "customer_email": user["email"], "customer_phone": user["phone"],
+            "total_price": 5000.0, "status": random.choice(statuses),
+            "created_at": now - timedelta(minutes=n), "updated_at": now,
+        })
+        if len(batch) == 5000:
+            await db.bookings.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.bookings.insert_many(batch, ordered=False)
+    # Indexed last, like generate_dataset.py: mongomock checks every index
+    # on every insert, which makes seeding an indexed collection quadratic
+    await ensure_indexes(db)
+    await ensure_slot_indexes(db)
+
+
+# ============ SCENARIOS ============
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+        self.latencies[name].append(time.perf_counter() - started)
+        self.statuses[name][status] += 1
+        return response
+
+
+class Context:
+    def __init__(self, experiences: int, users: int):
+        from auth import create_access_token
+
+        self.create_access_token = create_access_token
+        self.experiences = experiences
+        self.users = users
+        # Minted on first use; generate_dataset.py runs have far more users than a test touches
+        self.tokens = {}
+        self.admin_token = create_access_token({"sub": ADMIN_EMAIL})
+        self.today = date.today()
+
+    def user(self):
+        n = random.randrange(self.users)
+        if n not in self.tokens:
+            self.tokens[n] = self.create_access_token({"sub": f"user{n}@loadtest.example.com"})
+        return n, {"Authorization": f"Bearer {self.tokens[n]}"}
+
+
+async def browse(client, ctx: Context, rec: Recorder):
+    # Anonymous visitor: listing, one detail page, its calendar, maybe a search
+    await rec.request(client, "GET /api/experiences", "GET", "/api/experiences", params={"view": "summary", "limit": 20})
+    experience_id = random.randint(1, ctx.experiences)
+    await rec.request(client, "GET /api/experiences/{id}", "GET", f"/api/experiences/{experience_id}")
+    await rec.request(
+        client, "GET /api/experiences/{id}/availability", "GET", f"/api/experiences/{experience_id}/availability",
+        params={"from": ctx.today.isoformat(), "to": (ctx.today + timedelta(days=HORIZON_DAYS - 1)).isoformat()}
+    )
+    if random.random() < 0.3:
+        await rec.request(client, "GET /api/experiences/facets", "GET", "/api/experiences/facets")
+        term = random.choice(SEARCH_TERMS)
+        await rec.request(client, "GET /api/experiences/suggest", "GET", "/api/experiences/suggest", params={"q": term[:3]})
+        await rec.request(client, "GET /api/experiences/search", "GET", "/api/experiences/search", params={"q": term})
+
+async def login(client, ctx: Context, rec: Recorder):
+    # Mostly real users, some wrong passwords; rate limiting shows up as 429s
+    n = random.randrange(ctx.users)
+    password = PASSWORD if random.random() < 0.8 else "wrong-password"
+    await rec.request(
+        client, "POST /api/auth/login", "POST", "/api/auth/login",
+        data={"username": f"user{n}@loadtest.example.com", "password": password}
+    )
+
+async def book(client, ctx: Context, rec: Recorder):
+    from models import BookingCreate, PricingStructure
+    from pricing import quote_booking
+
+    n, headers = ctx.user()
+    if random.random() < 0.5:
+        slot, day = HOT_SLOT, ctx.today
+    else:
+        slot = {**HOT_SLOT, "experience_id": random.randint(1, ctx.experiences)}
+        day = ctx.today + timedelta(days=random.randrange(HORIZON_DAYS))
+    booking = BookingCreate(
+        experience_id=slot["experience_id"], experience_title="Load test", booking_type=slot["booking_type"],
+        # No add-ons selected, so the price is the same whatever add-ons the experience has
+        date=day.isoformat(), time=slot["time"], guests={"adults": 2, "kids": 1}, add_ons={"souvenirKits": 0},
+        customer_name=f"User {n}", customer_email=f"user{n}@loadtest.example.com", customer_phone="9999999999",
+        total_price=0
+    )
+    booking.total_price = quote_booking(PricingStructure(), [], booking)
+    await rec.request(client, "POST /api/bookings", "POST", "/api/bookings", json=booking.model_dump(), headers=headers)
+
+async def dashboard(client, ctx: Context, rec: Recorder):
+    _, headers = ctx.user()
+    await rec.request(client, "GET /api/auth/me", "GET", "/api/auth/me", headers=headers)
+    await rec.request(client, "GET /api/bookings", "GET", "/api/bookings", headers=headers)
+
+async def admin(client, ctx: Context, rec: Recorder):
+    headers = {"Authorization": f"Bearer {ctx.admin_token}"}
+    await rec.request(client, "GET /api/admin/stats", "GET", "/api/admin/stats", headers=headers)
+    response = await rec.request(
+        client, "GET /api/admin/bookings", "GET", "/api/admin/bookings", params={"limit": 100}, headers=headers
+    )
+    cursor = response.headers.get("X-Next-Cursor") if response is not None else None
+    if cursor:
+        await rec.request(
+            client, "GET /api/admin/bookings", "GET", "/api/admin/bookings",
+            params={"limit": 100, "cursor": cursor}, headers=headers
+        )
+
+SCENARIOS = {
+    "browse": (browse, 50),
+    "dashboard": (dashboard, 20),
+    "book": (book, 15),
+    "login": (login, 10),
+    "admin": (admin, 5),
+}
+
+
+# ============ RUNNER ============
+
+def percentile(sorted_values, q: float) -> float:
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+def report(rec: Recorder, elapsed: float) -> dict:
+    results = {}
+    for name in sorted(rec.latencies):
+        values = sorted(rec.latencies[name])
+        results[name] = {
+            "count": len(values),
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+            "statuses": {str(status): count for status, count in sorted(rec.statuses[name].items(), key=str)},
+        }
+    total = sum(result["count"] for result in results.values())
+
+    width = max(len(name) for name in results) if results else 10
+    print(f"\n{'endpoint':<{width}}  {'count':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  statuses")
+    for name, result in results.items():
+        statuses = " ".join(f"{status}:{count}" for status, count in result["statuses"].items())
+        print(f"{name:<{width}}  {result['count']:>7} {result['rps']:>8} {result['p50_ms']:>8} "
+              f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['max_ms']:>8}  {statuses}")
+    print(f"\n✓ {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), latencies in ms")
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "endpoints": results}
+
+async def virtual_user(client, ctx: Context, rec: Recorder, deadline: float, scenarios, weights):
+    while time.monotonic() < deadline:
+        scenario = random.choices(scenarios, weights)[0]
+        await scenario(client, ctx, rec)
+
+async def drive(client, args, only):
+    ctx = Context(args.experiences, args.users)
+    rec = Recorder()
+    chosen = [name for name in SCENARIOS if not only or name in only]
+    scenarios = [SCENARIOS[name][0] for name in chosen]
+    weights = [SCENARIOS[name][1] for name in chosen]
+    print(f"Running {args.concurrency} virtual users for {args.duration}s: {', '.join(chosen)}")
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*[
+        virtual_user(client, ctx, rec, deadline, scenarios, weights) for _ in range(args.concurrency)
+    ])
+    return report(rec, time.monotonic() - started)
+
+async def main(args):
+    random.seed(args.seed)
+    os.environ["DB_NAME"] = os.environ.get("DB_NAME", "andhra_darsan") + "_loadtest"
+    only = set(args.scenarios.split(",")) if args.scenarios else None
+
+    if args.in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--in-memory needs mongomock-motor (pip install mongomock-motor)")
+        # mongomock can't open change streams
+        os.environ["CACHE_CHANGE_STREAMS"] = "0"
+        mongo_client = AsyncMongoMockClient()
+    else:
+        from database import make_client
+        mongo_client = make_client()
+
+    from database import get_db
+    db = get_db(mongo_client)
+    if not args.no_seed:
+        # mongomock scans in Python, so the admin views would swamp a big dataset
+        bookings = args.bookings if args.bookings is not None else (IN_MEMORY_BOOKINGS if args.in_memory else 20000)
+        await seed(db, args.experiences, args.users, bookings)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+            results = await drive(client, args, only)
+    else:
+        from server import create_app
+        app = create_app(mongo_client)
+        transport = httpx.ASGITransport(app=app)
+        # ASGITransport doesn't send lifespan events, so run startup/shutdown here
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits, timeout=30) as client:
+                results = await drive(client, args, only)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+    if not args.in_memory and not args.keep:
+        await mongo_client.drop_database(db.name)
+    mongo_client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive the API with weighted traffic scenarios")
+    parser.add_argument("--base-url", help="hit a running server instead of an in-process app")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users")
+    parser.add_argument("--scenarios", help=f"comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--experiences", type=int, default=20)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--bookings", type=int, help=f"existing bookings for the admin views (default 20000, {IN_MEMORY_BOOKINGS} with --in-memory)")
+    parser.add_argument("--no-seed", action="store_true", help="reuse data from a previous --keep run or generate_dataset.py")
+    parser.add_argument("--keep", action="store_true", help="don't drop the load test database afterwards")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--output", help="also write results as JSON, e.g. to diff runs")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+import asyncio
+from dotenv import load_dotenv
+from pathlib import Path
+from pydantic import ValidationError
+from pymongo import UpdateOne
+
+from models import Slot
+from availability import SLOT_KEY, ensure_slot_indexes, flatten_availability
+from database import get_db, make_client
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+client = make_client()
+db = get_db(client)
+
+async def migrate_availability():
+    print("Moving embedded availability into the slots collection...")
+    
+    await ensure_slot_indexes(db)
+    
+    migrated_experiences = 0
+    migrated_slots = 0
+    skipped_slots = 0
+    cursor = db.experiences.find(
+        {"availability": {"$exists": True}},
+        {"id": 1, "availability": 1}
+    )
+    async for experience in cursor:
+        slots = []
+        for slot in flatten_availability(experience["id"], experience.get("availability") or []):
+            try:
+                slots.append(Slot(**slot).dict())
+            except ValidationError as e:
+                # e.g. {"time", "available"} slots from the old update_experiences_schema.py
+                skipped_slots += 1
+                fields = ", ".join(".".join(map(str, error["loc"])) for error in e.errors())
+                print(f"✗ Experience {experience['id']}: skipped {slot.get('date')} {slot.get('time')} (missing or invalid {fields})")
+        if slots:
+            # The embedded copy is authoritative, so booked seats carry over as-is.
+            # Upserting on the slot key makes re-running the migration safe.
+            await db.slots.bulk_write([
+                UpdateOne(
+                    {k: slot[k] for k in SLOT_KEY},
+                    {"$set": slot},
+                    upsert=True
+                )
+                for slot in slots
+            ], ordered=False)
+        
+        await db.experiences.update_one(
+            {"_id": experience["_id"]},
+            {"$unset": {"availability": ""}}
+        )
+        migrated_experiences += 1
+        migrated_slots += len(slots)
+        print(f"✓ Experience {experience['id']}: {len(slots)} slots")
+    
+    print(f"✅ Migrated {migrated_slots} slots from {migrated_experiences} experiences")
+    if skipped_slots:
+        print(f"⚠️  Skipped {skipped_slots} invalid slots; republish those dates from the admin form")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_availability())
+    client.close()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Annotated, Optional, List
 from datetime import datetime
 import uuid
 
@@ -40,6 +40,17 @@ class DayAvailability(BaseModel):
     date: str  # Format: YYYY-MM-DD
     timeSlots: List[TimeSlot]
 
+class SlotTemplate(BaseModel):
+    # Slot published for every day by the rolling availability generator
+    time: str
+    bookingType: str
+    maxCapacity: int
+
+class Slot(TimeSlot):
+    # One document in the slots collection
+    experience_id: int
+    date: str  # Format: YYYY-MM-DD
+
 class AddOn(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -86,6 +97,45 @@ class Experience(BaseModel):
     pricing: Optional[PricingStructure] = PricingStructure()
     addOns: Optional[List[AddOn]] = []
     availability: Optional[List[DayAvailability]] = []
+    slotTemplates: Optional[List[SlotTemplate]] = None
+
+class ExperienceSummary(BaseModel):
+    # Card fields for listing pages
+    id: int
+    title: str
+    category: str
+    location: str
+    duration: str
+    price: int
+    rating: float
+    image: str
+    featured: bool = False
+    bookingTypes: Optional[List[str]] = ["private", "shared", "group"]
+
+class ExperienceSearchResult(ExperienceSummary):
+    score: float
+
+class ExperienceSuggestion(BaseModel):
+    id: int
+    title: str
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class PriceBucket(BaseModel):
+    min: int
+    max: Optional[int] = None  # None for the open-ended top bucket
+    count: int
+
+class ExperienceFacets(BaseModel):
+    total: int
+    category: List[FacetCount]
+    location: List[FacetCount]
+    bookingTypes: List[FacetCount]
+    price: List[PriceBucket]
+    minPrice: Optional[int] = None
+    maxPrice: Optional[int] = None
 
 class ExperienceCreate(BaseModel):
     title: str
@@ -106,6 +156,7 @@ class ExperienceCreate(BaseModel):
     pricing: Optional[PricingStructure] = PricingStructure()
     addOns: Optional[List[AddOn]] = []
     availability: Optional[List[DayAvailability]] = []
+    slotTemplates: Optional[List[SlotTemplate]] = None
 
 class ExperienceUpdate(BaseModel):
     title: Optional[str] = None
@@ -126,17 +177,18 @@ class ExperienceUpdate(BaseModel):
     pricing: Optional[PricingStructure] = None
     addOns: Optional[List[AddOn]] = None
     availability: Optional[List[DayAvailability]] = None
+    slotTemplates: Optional[List[SlotTemplate]] = None
 
 # Booking Models
 class GuestCount(BaseModel):
-    adults: int = 1
-    kids: int = 0
+    adults: int = Field(1, ge=1)
+    kids: int = Field(0, ge=0)
 
 class AddOns(BaseModel):
     pickup: bool = False
     pickupLocation: str = ""
-    specialPuja: int = 0
-    souvenirKits: int = 1
+    specialPuja: int = Field(0, ge=0)
+    souvenirKits: int = Field(1, ge=0)
     photography: bool = False
 
 class BookingCreate(BaseModel):
@@ -167,6 +219,46 @@ class BookingUpdate(BaseModel):
     add_ons: Optional[AddOns] = None
     status: Optional[str] = None
 
+# Availability calendar
+class CalendarSlot(BaseModel):
+    time: str
+    bookingType: str
+
+class CalendarDay(BaseModel):
+    date: str
+    remaining: List[Optional[int]]  # one entry per AvailabilityCalendar.slots column
+
+class AvailabilityCalendar(BaseModel):
+    experience_id: int
+    from_: str = Field(alias="from")
+    to: str
+    slots: List[CalendarSlot]
+    days: List[CalendarDay]
+    open: str  # "1"/"0" per date from..to
+
+# Quote Models
+class QuoteRequest(BaseModel):
+    booking_types: List[str] = Field(["private", "shared", "group"], max_length=3)
+    adults: List[Annotated[int, Field(ge=1)]] = Field([1], max_length=50)
+    kids: List[Annotated[int, Field(ge=0)]] = Field([0], max_length=50)
+    group_sizes: List[Annotated[int, Field(ge=1)]] = Field([10], max_length=50)
+    add_ons: List[AddOns] = Field([AddOns()], max_length=50)
+
+class Quote(BaseModel):
+    booking_type: str
+    adults: int
+    kids: int
+    group_size: Optional[int] = None
+    add_ons: AddOns
+    base_price: int
+    add_ons_price: int
+    total_price: int
+
+class QuoteResponse(BaseModel):
+    experience_id: int
+    pricing_version: str
+    quotes: List[Quote]
+
 # Token Models
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import os
+import smtplib
+import socket
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email import policy
+from email.message import EmailMessage
+from email.utils import formatdate
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING
+
+from database import get_db, make_client
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+SMTP_HOST = os.environ.get("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "25"))
+SMTP_USERNAME = os.environ.get("SMTP_USERNAME")
+SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD")
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "0") == "1"
+SMTP_TIMEOUT = float(os.environ.get("SMTP_TIMEOUT", "30"))
+# Concurrent SMTP sessions; also the number of sending threads
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", "8"))
+# Most relays cap messages per session; reconnect before hitting the cap
+SMTP_MESSAGES_PER_CONNECTION = int(os.environ.get("SMTP_MESSAGES_PER_CONNECTION", "100"))
+NEWSLETTER_FROM = os.environ.get("NEWSLETTER_FROM", "Andhra Darsan <hello@andhradarsan.com>")
+# Subscribers per checkpoint; a crash re-sends at most this many
+DISPATCH_BATCH = 500
+MAX_FAILURES_KEPT = 100
+
+
+class PermanentFailure(Exception):
+    """The server rejected this recipient for good (5xx); skip and carry on."""
+
+
+class _Connection:
+    def __init__(self):
+        self.smtp: Optional[smtplib.SMTP] = None
+        self.sent = 0
+
+
+class SMTPPool:
+    """Up to ``size`` SMTP sessions, each used by one sending thread at a time.
+
+    smtplib blocks, so sends run on a dedicated executor rather than the
+    event loop. Sessions open lazily, are reused across messages and get
+    recycled after SMTP_MESSAGES_PER_CONNECTION sends.
+    """
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        size: int = SMTP_POOL_SIZE,
+        username: Optional[str] = SMTP_USERNAME,
+        password: Optional[str] = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        timeout: float = SMTP_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connects = 0
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(_Connection())
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+            smtp.ehlo()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        self.connects += 1
+        return smtp
+
+    @staticmethod
+    def _close(connection: _Connection):
+        if connection.smtp is not None:
+            try:
+                connection.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        connection.smtp = None
+
+    def _send(self, connection: _Connection, sender: str, recipient: str, message: bytes):
+        if connection.sent >= SMTP_MESSAGES_PER_CONNECTION:
+            self._close(connection)
+        for retry in (False, True):
+            if connection.smtp is None:
+                connection.smtp = self._connect()
+                connection.sent = 0
+            try:
+                connection.smtp.sendmail(sender, [recipient], message)
+                connection.sent += 1
+                return
+            except smtplib.SMTPServerDisconnected:
+                # Idle sessions get dropped by the server; reconnect and retry once
+                connection.smtp = None
+                if retry:
+                    raise
+            except smtplib.SMTPRecipientsRefused as e:
+                codes = [code for code, _ in e.recipients.values()]
+                if all(code >= 500 for code in codes):
+                    raise PermanentFailure(f"{codes[0]} recipient refused") from e
+                raise
+            except smtplib.SMTPDataError as e:
+                if e.smtp_code >= 500:
+                    raise PermanentFailure(f"{e.smtp_code} {e.smtp_error.decode(errors='replace')}") from e
+                raise
+            except (smtplib.SMTPException, OSError):
+                # Don't hand a session in an unknown state to the next send
+                self._close(connection)
+                raise
+
+    async def send(self, sender: str, recipient: str, message: bytes):
+        connection = await self._idle.get()
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._send, connection, sender, recipient, message)
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        while not self._idle.empty():
+            await loop.run_in_executor(self._executor, self._close, self._idle.get_nowait())
+        self._executor.shutdown()
+
+
+# ============ CAMPAIGNS ============
+
+def render(campaign: dict) -> bytes:
+    """The message every recipient gets, minus its To header, rendered once
+    per campaign. There is no per-recipient templating, so the body never
+    has to be re-encoded."""
+    message = EmailMessage(policy=policy.SMTP)
+    message["From"] = campaign["sender"]
+    message["Subject"] = campaign["subject"]
+    message["Date"] = formatdate(localtime=True)
+    message.set_content(campaign["text"])
+    if campaign.get("html"):
+        message.add_alternative(campaign["html"], subtype="html")
+    return bytes(message)
+
+def address(recipient: str, body: bytes) -> bytes:
+    return f"To: {recipient}\r\n".encode() + body
+
+async def create_campaign(db, subject: str, text: str, html: Optional[str] = None, sender: str = NEWSLETTER_FROM) -> dict:
+    now = datetime.utcnow()
+    campaign = {
+        "id": str(uuid.uuid4()),
+        "subject": subject,
+        "text": text,
+        "html": html,
+        "sender": sender,
+        "status": "sending",
+        # Subscribers are sent in email order; everything up to here is done
+        "checkpoint": "",
+        "sent": 0,
+        "failed": 0,
+        "failures": [],
+        "created_at": now,
+        "updated_at": now,
+    }
+    await db.newsletter_campaigns.insert_one(campaign)
+    return campaign
+
+async def dispatch_campaign(db, campaign: dict, pool: SMTPPool, batch_size: int = DISPATCH_BATCH, on_batch=None) -> dict:
+    """Send ``campaign`` to every active subscriber after its checkpoint.
+
+    Subscribers stream from a cursor in email order (the status+email index)
+    and go out ``batch_size`` at a time, as concurrently as the pool allows.
+    The checkpoint only moves once a whole batch is done, so after a crash
+    the same call picks up where it stopped, re-sending at most one batch.
+    Permanently rejected recipients are counted and skipped; anything else
+    (relay down, auth, timeouts) aborts the run with the checkpoint intact.
+    """
+    body = render(campaign)
+    sender = campaign["sender"]
+    stats = {"sent": 0, "failed": 0, "seconds": 0.0}
+    started = time.perf_counter()
+
+    async def send(email: str):
+        try:
+            await pool.send(sender, email, address(email, body))
+            return None
+        except PermanentFailure as e:
+            return {"email": email, "error": str(e)}
+
+    async def flush(emails: List[str]):
+        # Let the whole batch settle before giving up, so no sends outlive the pool
+        results = await asyncio.gather(*[send(email) for email in emails], return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        failures = [result for result in results if result]
+        await db.newsletter_campaigns.update_one(
+            {"id": campaign["id"]},
+            {
+                "$set": {"checkpoint": emails[-1], "updated_at": datetime.utcnow()},
+                "$inc": {"sent": len(emails) - len(failures), "failed": len(failures)},
+                "$push": {"failures": {"$each": failures, "$slice": MAX_FAILURES_KEPT}},
+            }
+        )
+        stats["sent"] += len(emails) - len(failures)
+        stats["failed"] += len(failures)
+        stats["seconds"] = time.perf_counter() - started
+        if on_batch:
+            on_batch(stats)
+
+    cursor = db.newsletter_subscribers.find(
+        {"status": "active", "email": {"$gt": campaign["checkpoint"]}}, {"_id": 0, "email": 1}
+    ).sort("email", ASCENDING).batch_size(batch_size)
+
+    batch = []
+    async for subscriber in cursor:
+        batch.append(subscriber["email"])
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    await db.newsletter_campaigns.update_one(
+        {"id": campaign["id"]},
+        {"$set": {"status": "completed", "completed_at": datetime.utcnow(), "updated_at": datetime.utcnow()}}
+    )
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+# ============ CLI ============
+
+def start_sink():
+    """An in-process aiosmtpd server that accepts and counts everything, for
+    trying the dispatcher (and measuring it) without a real relay."""
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        raise SystemExit("--sink needs aiosmtpd (pip install aiosmtpd)")
+
+    class Sink:
+        received = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            self.received += len(envelope.rcpt_tos)
+            return "250 Message accepted"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = Sink()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, handler
+
+def print_progress(stats: dict):
+    rate = stats["sent"] / stats["seconds"] if stats["seconds"] else 0
+    sys.stdout.write(f"\r  sent {stats['sent']:,}, failed {stats['failed']:,} ({rate:,.0f} sends/s)")
+    sys.stdout.flush()
+
+async def main(args):
+    client = make_client()
+    db = client[args.db] if args.db else get_db(client)
+
+    if args.campaign:
+        campaign = await db.newsletter_campaigns.find_one({"id": args.campaign}, {"_id": 0})
+        if not campaign:
+            raise SystemExit(f"No campaign {args.campaign}")
+        if campaign["status"] == "completed":
+            raise SystemExit(f"Campaign {args.campaign} already completed")
+        print(f"Resuming campaign {campaign['id']} after {campaign['checkpoint'] or 'the start'} ({campaign['sent']:,} sent so far)")
+    else:
+        if not args.subject or not args.text:
+            raise SystemExit("A new campaign needs --subject and --text")
+        html = Path(args.html).read_text() if args.html else None
+        campaign = await create_campaign(db, args.subject, Path(args.text).read_text(), html)
+        print(f"Created campaign {campaign['id']}")
+
+    sink = None
+    host, port = args.smtp_host, args.smtp_port
+    if args.sink:
+        sink, handler = start_sink()
+        host, port = sink.hostname, sink.port
+        print(f"✓ Sending to a local aiosmtpd sink on {host}:{port}")
+
+    pool = SMTPPool(host=host, port=port, size=args.concurrency)
+    try:
+        stats = await dispatch_campaign(db, campaign, pool, args.batch_size, print_progress)
+    except (smtplib.SMTPException, OSError) as e:
+        print(f"\n✗ Dispatch stopped: {e}")
+        print(f"  Resume with --campaign {campaign['id']}")
+        raise SystemExit(1)
+    finally:
+        await pool.close()
+        if sink:
+            sink.stop()
+        client.close()
+
+    rate = stats["sent"] / stats["seconds"] if stats["seconds"] else 0
+    print(f"\n✅ Sent {stats['sent']:,} ({stats['failed']:,} rejected) in {stats['seconds']:.1f}s: "
+          f"{rate:,.0f} sends/s over {pool.connects} SMTP connections")
+    if sink:
+        print(f"✓ Sink received {handler.received:,} messages")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a newsletter campaign to every active subscriber")
+    parser.add_argument("--subject", help="subject of a new campaign")
+    parser.add_argument("--text", help="file with the plain-text body")
+    parser.add_argument("--html", help="optional file with an HTML alternative")
+    parser.add_argument("--campaign", help="resume this campaign id from its checkpoint")
+    parser.add_argument("--concurrency", type=int, default=SMTP_POOL_SIZE, help="SMTP sessions in parallel")
+    parser.add_argument("--batch-size", type=int, default=DISPATCH_BATCH, help="subscribers per checkpoint")
+    parser.add_argument("--smtp-host", default=SMTP_HOST)
+    parser.add_argument("--smtp-port", type=int, default=SMTP_PORT)
+    parser.add_argument("--sink", action="store_true", help="send to an in-process aiosmtpd server instead")
+    parser.add_argument("--db", help="database to read subscribers from (default: DB_NAME)")
+    asyncio.run(main(parser.parse_args()))
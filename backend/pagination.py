@@ -0,0 +1,25 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(position: dict) -> str:
+    # Opaque to clients; it only has to round-trip through decode_cursor
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except ValueError:
+        position = None
+    if not isinstance(position, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return position
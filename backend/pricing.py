@@ -0,0 +1,166 @@
+import hashlib
+import itertools
+import json
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models import AddOn, AddOns, PricingStructure, QuoteRequest
+
+BOOKING_TYPES = ("private", "shared", "group")
+MAX_QUOTES = 5000
+
+# The add-on menu every experience starts with (update_experiences_schema.py)
+DEFAULT_ADD_ONS = [
+    {
+        "id": "addon-1",
+        "name": "Pickup & Drop Off - Vijayawada",
+        "description": "Round trip from Vijayawada",
+        "price": 1800,
+        "calculationType": "per_3_guests",
+        "active": True
+    },
+    {
+        "id": "addon-2",
+        "name": "Pickup & Drop Off - Guntur",
+        "description": "Round trip from Guntur",
+        "price": 2300,
+        "calculationType": "per_3_guests",
+        "active": True
+    },
+    {
+        "id": "addon-3",
+        "name": "Special Puja Tickets",
+        "description": "VIP temple access",
+        "price": 500,
+        "calculationType": "per_person",
+        "active": True
+    },
+    {
+        "id": "addon-4",
+        "name": "Souvenir Kits",
+        "description": "Cultural memory kits",
+        "price": 1000,
+        "calculationType": "per_adult",
+        "active": True
+    },
+    {
+        "id": "addon-5",
+        "name": "Photography / Reels",
+        "description": "10 photos + 2 reels",
+        "price": 1500,
+        "calculationType": "flat",
+        "active": True
+    }
+]
+
+
+def pricing_version(pricing: Optional[dict], add_ons: Optional[list]) -> str:
+    # Changes whenever anything that can move a price changes
+    raw = json.dumps({"pricing": pricing, "addOns": add_ons}, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+def quote_grid_size(request: QuoteRequest) -> int:
+    """How many quotes expand_quote_grid would produce, without building them."""
+    per_type = len(request.adults) * len(request.kids) * len(request.add_ons)
+    return sum(
+        per_type * (len(request.group_sizes) if booking_type == "group" else 1)
+        for booking_type in request.booking_types
+    )
+
+def expand_quote_grid(request: QuoteRequest) -> List[Tuple[str, int, int, Optional[int], AddOns]]:
+    """Every (booking type, adults, kids, group size, add-ons) combination.
+
+    Group size only varies for group bookings, like in the booking widget.
+    """
+    grid = []
+    for booking_type in request.booking_types:
+        group_sizes = request.group_sizes if booking_type == "group" else [None]
+        grid.extend(
+            (booking_type, adults, kids, group_size, add_ons)
+            for adults, kids, group_size, add_ons in itertools.product(
+                request.adults, request.kids, group_sizes, request.add_ons
+            )
+        )
+    return grid
+
+def price_grid(pricing: PricingStructure, add_ons: List[AddOn], grid) -> Tuple[np.ndarray, np.ndarray]:
+    """Base and add-on prices for a whole grid in one vectorized pass.
+
+    Mirrors calculatePrice() in the frontend's ExperienceDetail page.
+    """
+    n = len(grid)
+    booking_type = np.array([
+        BOOKING_TYPES.index(config[0]) if config[0] in BOOKING_TYPES else -1
+        for config in grid
+    ], dtype=np.int8)
+    adults = np.fromiter((config[1] for config in grid), dtype=np.int64, count=n)
+    kids = np.fromiter((config[2] for config in grid), dtype=np.int64, count=n)
+    group_size = np.fromiter((config[3] or 0 for config in grid), dtype=np.int64, count=n)
+
+    base = np.zeros(n, dtype=np.int64)
+    private = pricing.private or {}
+    if private.get("enabled"):
+        private_price = private["firstAdult"] + (adults - 1) * private["additionalAdult"] + kids * private["child"]
+        base = np.where(booking_type == 0, private_price, base)
+    shared = pricing.shared or {}
+    if shared.get("enabled"):
+        shared_price = adults * shared["adult"] + kids * shared["child"]
+        base = np.where(booking_type == 1, shared_price, base)
+    group = pricing.group or {}
+    if group.get("enabled"):
+        per_person = np.where(
+            group_size <= group["tier1"]["max"],
+            group["tier1"]["pricePerPerson"],
+            group["tier2"]["pricePerPerson"]
+        )
+        base = np.where(booking_type == 2, group_size * per_person, base)
+
+    guests = adults + kids
+    selected = [config[4] for config in grid]
+    pickup_location = np.array([
+        extras.pickupLocation if extras.pickup else "" for extras in selected
+    ])
+    special_puja = np.fromiter((extras.specialPuja for extras in selected), dtype=np.int64, count=n)
+    souvenir_kits = np.fromiter((extras.souvenirKits for extras in selected), dtype=np.int64, count=n)
+    photography = np.fromiter((extras.photography for extras in selected), dtype=bool, count=n)
+
+    add_ons_price = np.zeros(n, dtype=np.int64)
+    for addon in add_ons:
+        if not addon.active:
+            continue
+        if "Pickup" in addon.name:
+            if addon.calculationType != "per_3_guests":
+                continue
+            for location in ("Vijayawada", "Guntur"):
+                if location in addon.name:
+                    trips = -(-guests // 3)
+                    add_ons_price += np.where(pickup_location == location.lower(), trips * addon.price, 0)
+        elif "Special Puja" in addon.name and addon.calculationType == "per_person":
+            add_ons_price += special_puja * addon.price
+        elif "Souvenir" in addon.name and addon.calculationType == "per_adult":
+            add_ons_price += souvenir_kits * addon.price
+        elif "Photography" in addon.name and addon.calculationType == "flat":
+            add_ons_price += np.where(photography, addon.price, 0)
+
+    return base, add_ons_price
+
+def booking_type_error(pricing: PricingStructure, booking_type: str, group_size: Optional[int]) -> Optional[str]:
+    """Why a booking can't be priced as requested, or None.
+
+    price_grid prices unknown and disabled booking types at 0, so bookings
+    have to be checked before their total is trusted.
+    """
+    config = getattr(pricing, booking_type, None) if booking_type in BOOKING_TYPES else None
+    if not config or not config.get("enabled"):
+        return f"'{booking_type}' bookings are not available for this experience"
+    if booking_type == "group":
+        low, high = config["tier1"]["min"], config["tier2"]["max"]
+        if group_size is None or not low <= group_size <= high:
+            return f"Group size must be between {low} and {high}"
+    return None
+
+def quote_booking(pricing: PricingStructure, add_ons: List[AddOn], booking) -> int:
+    grid = [(booking.booking_type, booking.guests.adults, booking.guests.kids, booking.group_size, booking.add_ons)]
+    base, add_ons_price = price_grid(pricing, add_ons, grid)
+    return int(base[0] + add_ons_price[0])
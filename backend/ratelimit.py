@@ -0,0 +1,50 @@
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets: ``burst`` requests at once, refilled at
+    ``rate_per_minute``.
+
+    Keys are tracked LRU up to ``maxsize``; an evicted key simply starts again
+    with a full bucket, so memory stays bounded however many IPs or emails an
+    attacker rotates through.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, maxsize: int = 100000):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.maxsize = maxsize
+        self.allowed = 0
+        self.rejected = 0
+        self._buckets = OrderedDict()
+
+    def acquire(self, key: Hashable) -> float:
+        """Take one token for ``key``. Returns 0 when admitted, otherwise the
+        seconds until a token becomes available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            self.allowed += 1
+            retry_after = 0.0
+        else:
+            self.rejected += 1
+            retry_after = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "tracked": len(self._buckets),
+            "maxsize": self.maxsize,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,268 @@
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Field weights for ranking; title and taxonomy matches beat body text
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "category": 2.0,
+    "location": 2.0,
+    "highlights": 1.5,
+    "whoIsThisFor": 1.0,
+    "description": 1.0,
+}
+STOP_WORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "or", "the", "to", "with"}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Caps how many index terms one query token may expand to
+MAX_EXPANSIONS = 50
+# Completions and typo matches rank below exact matches
+INEXACT_FACTOR = 0.8
+
+
+def tokenize(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return [token for token in TOKEN_RE.findall(text) if token not in STOP_WORDS]
+
+def _max_edits(term: str) -> int:
+    # Short words get no typo budget, otherwise "tea" would match half the catalog
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+def _quality(token: str, term: str, distance: int) -> float:
+    if term == token:
+        return 1.0
+    return INEXACT_FACTOR * 0.5 ** distance
+
+
+class _TrieNode:
+    __slots__ = ("children", "term")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.term: Optional[str] = None
+
+
+class _Trie:
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, term: str):
+        node = self.root
+        for char in term:
+            node = node.children.setdefault(char, _TrieNode())
+        node.term = term
+
+    def _walk(self, query: str, budget: int, prefix: bool, live: Callable[[str], bool]) -> List[Tuple[int, _TrieNode]]:
+        """(distance, node) for every trie node within ``budget`` edits of
+        ``query``; with ``prefix``, the nodes whose path is, so their whole
+        subtree completes it. Levenshtein rows are only computed inside the
+        diagonal band that can still be within budget, and branches that
+        can't get back under it are cut."""
+        size = len(query)
+        too_far = budget + 1
+        hits = []
+        # Reversed onto the stack so nodes pop in insertion (depth-first) order,
+        # which decides ties when more terms match than there are slots
+        stack = [(child, char, 1, list(range(size + 1))) for char, child in reversed(self.root.children.items())]
+        while stack:
+            node, char, depth, previous_row = stack.pop()
+            row = [depth if depth <= budget else too_far] + [too_far] * size
+            best = row[0]
+            for i in range(max(1, depth - budget), min(size, depth + budget) + 1):
+                cost = previous_row[i - 1] + (query[i - 1] != char)
+                if row[i - 1] + 1 < cost:
+                    cost = row[i - 1] + 1
+                if previous_row[i] + 1 < cost:
+                    cost = previous_row[i] + 1
+                row[i] = cost
+                if cost < best:
+                    best = cost
+            if best > budget:
+                continue
+            distance = row[size]
+            if distance <= budget:
+                if prefix:
+                    hits.append((distance, node))
+                    # Nothing below an exact prefix can be closer
+                    if distance == 0:
+                        continue
+                elif node.term and live(node.term):
+                    hits.append((distance, node))
+            for next_char, child in reversed(node.children.items()):
+                stack.append((child, next_char, depth + 1, row))
+        return hits
+
+    def fuzzy(
+        self,
+        query: str,
+        max_edits: int,
+        prefix: bool,
+        live: Callable[[str], bool],
+        enough: Optional[Callable[[Dict[str, int]], bool]] = None,
+    ) -> List[Tuple[str, int]]:
+        """Terms within ``max_edits`` edits of ``query``, or, with ``prefix``,
+        completions of anything within ``max_edits`` of it. Returns
+        (term, distance) pairs, closest first.
+
+        The edit budget grows one step at a time and stops as soon as
+        ``enough(matches)`` holds (by default: MAX_EXPANSIONS terms), so a
+        query that matches closely never pays for the much wider walk a
+        larger budget needs."""
+        if not query:
+            return []
+        if enough is None:
+            enough = lambda found: len(found) >= MAX_EXPANSIONS
+        matches: Dict[str, int] = {}
+
+        def collect(node: _TrieNode, distance: int):
+            # Shortest completions first
+            level = [node]
+            while level and len(matches) < MAX_EXPANSIONS:
+                next_level = []
+                for current in level:
+                    if current.term and live(current.term) and current.term not in matches:
+                        matches[current.term] = distance
+                    next_level.extend(current.children.values())
+                level = next_level
+
+        for budget in range(max_edits + 1):
+            # Closest hits claim the MAX_EXPANSIONS slots first; terms already
+            # found at a smaller budget keep their true distance
+            for distance, node in sorted(self._walk(query, budget, prefix, live), key=lambda hit: hit[0]):
+                if len(matches) >= MAX_EXPANSIONS:
+                    break
+                if prefix:
+                    collect(node, distance)
+                elif node.term not in matches:
+                    matches[node.term] = distance
+            if len(matches) >= MAX_EXPANSIONS or enough(matches):
+                break
+        return sorted(matches.items(), key=lambda match: match[1])
+
+
+class SearchIndex:
+    """In-memory inverted index over the catalog, with a title trie for
+    typeahead.
+
+    Documents are added and removed one at a time, so admin edits update the
+    index incrementally instead of rebuilding it.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._title_postings: Dict[str, Dict[int, None]] = defaultdict(dict)
+        self._summaries: Dict[int, dict] = {}
+        # Tries only grow; terms that lost all their documents are skipped
+        self._terms = _Trie()
+        self._title_terms = _Trie()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def upsert(self, experience: dict, summary: dict):
+        experience_id = experience["id"]
+        self.remove(experience_id)
+
+        weights: Dict[str, float] = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            value = experience.get(field) or ""
+            if isinstance(value, list):
+                value = " ".join(value)
+            for token in tokenize(value):
+                weights[token] += weight
+        for term, weight in weights.items():
+            self._postings[term][experience_id] = weight
+            self._terms.insert(term)
+        for term in tokenize(experience.get("title") or ""):
+            self._title_postings[term][experience_id] = None
+            self._title_terms.insert(term)
+
+        self._doc_terms[experience_id] = dict(weights)
+        self._summaries[experience_id] = summary
+
+    def remove(self, experience_id: int):
+        for term in self._doc_terms.pop(experience_id, {}):
+            postings = self._postings[term]
+            postings.pop(experience_id, None)
+            if not postings:
+                del self._postings[term]
+            title_postings = self._title_postings.get(term)
+            if title_postings is not None:
+                title_postings.pop(experience_id, None)
+                if not title_postings:
+                    del self._title_postings[term]
+        self._summaries.pop(experience_id, None)
+
+    def clear(self):
+        self.__init__()
+
+    def _expand(self, token: str, prefix: bool) -> List[Tuple[str, float]]:
+        """Index terms a query token stands for, with a match-quality factor."""
+        if not prefix and token in self._postings:
+            return [(token, 1.0)]
+        matches = self._terms.fuzzy(token, _max_edits(token), prefix, self._postings.__contains__)
+        return [(term, _quality(token, term, distance)) for term, distance in matches]
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        total = len(self._doc_terms) or 1
+        scores: Dict[int, float] = defaultdict(float)
+        for position, token in enumerate(tokens):
+            # The last token may still be being typed
+            is_last = position == len(tokens) - 1
+            for term, quality in self._expand(token, prefix=is_last):
+                postings = self._postings[term]
+                idf = math.log(1 + total / len(postings))
+                for experience_id, weight in postings.items():
+                    scores[experience_id] += quality * idf * (1 + math.log(weight))
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{**self._summaries[experience_id], "score": round(score, 4)} for experience_id, score in ranked]
+
+    def suggest(self, text: str, limit: int = 8) -> List[dict]:
+        """Title completions for a partially typed query.
+
+        Only the last token is completed; earlier tokens re-rank candidates.
+        Work is bounded by MAX_EXPANSIONS and ``limit``, not catalog size.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        *leading, last = tokens
+        wanted = limit * 5
+        # Closer completions fill the candidate list first, so once the terms
+        # found so far cover ``wanted`` titles a wider typo budget can't
+        # change the result
+        completions = self._title_terms.fuzzy(
+            last, _max_edits(last), True, self._title_postings.__contains__,
+            enough=lambda found: sum(len(self._title_postings[term]) for term in found) >= wanted
+        )
+
+        candidates: Dict[int, float] = {}
+        for term, distance in completions:
+            for experience_id in self._title_postings[term]:
+                if experience_id not in candidates:
+                    candidates[experience_id] = _quality(last, term, distance)
+                    if len(candidates) >= wanted:
+                        break
+            if len(candidates) >= wanted:
+                break
+
+        leading_terms = [dict(self._expand(token, prefix=False)) for token in leading]
+        for experience_id in candidates:
+            doc_terms = self._doc_terms[experience_id]
+            for expansions in leading_terms:
+                candidates[experience_id] += max(
+                    (quality for term, quality in expansions.items() if term in doc_terms),
+                    default=0.0
+                )
+        ranked = sorted(candidates.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            {"id": experience_id, "title": self._summaries[experience_id]["title"]}
+            for experience_id, _ in ranked
+        ]
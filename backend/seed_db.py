@@ -1,15 +1,14 @@
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+from database import get_db, make_client
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client = make_client()
+db = get_db(client)
 
 experiences_data = [
     {
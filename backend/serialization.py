@@ -0,0 +1,42 @@
+import time
+from typing import Any, List, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from metrics import SERIALIZATION_LATENCY
+from models import Booking, Experience, ExperienceSummary
+
+# Built once; pydantic-core reuses the compiled validator/serializer per call
+EXPERIENCE = TypeAdapter(Experience)
+EXPERIENCE_LIST = TypeAdapter(List[Experience])
+EXPERIENCE_SUMMARY_LIST = TypeAdapter(List[ExperienceSummary])
+BOOKING = TypeAdapter(Booking)
+BOOKING_LIST = TypeAdapter(List[Booking])
+
+# Metric labels
+_ADAPTER_NAMES = {
+    EXPERIENCE: "Experience",
+    EXPERIENCE_LIST: "List[Experience]",
+    EXPERIENCE_SUMMARY_LIST: "List[ExperienceSummary]",
+    BOOKING: "Booking",
+    BOOKING_LIST: "List[Booking]",
+}
+
+
+def dump_models(adapter: TypeAdapter, data: Any) -> bytes:
+    """Validate raw Mongo documents once and encode them straight to JSON.
+
+    Both steps run inside pydantic-core, replacing the usual
+    Model(**doc) -> response_model re-validation -> jsonable_encoder chain.
+    """
+    started = time.perf_counter()
+    try:
+        return adapter.dump_json(adapter.validate_python(data))
+    finally:
+        SERIALIZATION_LATENCY.observe(time.perf_counter() - started, _ADAPTER_NAMES.get(adapter, "other"))
+
+def model_response(adapter: TypeAdapter, data: Any, headers: Optional[dict] = None) -> Response:
+    # Returning a Response skips FastAPI's response_model pass; the route's
+    # response_model still documents the shape.
+    return Response(content=dump_models(adapter, data), media_type="application/json", headers=headers)
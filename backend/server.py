@@ -1,35 +1,113 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, Query, Request, Response, UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import ValidationError
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
+import io
+import uuid
+import math
+import csv
+import json
+import time
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
-from datetime import timedelta
-from typing import List, Optional
+from datetime import date, datetime, timedelta
+from typing import List, Literal, Optional, Union
 
 from models import (
     User, UserCreate, UserLogin, UserInDB, Token,
-    Experience, ExperienceCreate, ExperienceUpdate,
+    Experience, ExperienceSummary, ExperienceCreate, ExperienceUpdate,
+    ExperienceSearchResult, ExperienceSuggestion, ExperienceFacets, FacetCount,
+    AvailabilityCalendar, PricingStructure, AddOn, QuoteRequest, Quote, QuoteResponse,
     Booking, BookingCreate, BookingUpdate,
     NewsletterSubscriber, NewsletterSubscribe
 )
 from auth import (
-    get_password_hash, verify_password, create_access_token,
-    get_current_user, get_current_admin_user, ACCESS_TOKEN_EXPIRE_MINUTES
+    hash_password, verify_and_update_password, hash_stats, create_access_token,
+    get_current_user, get_current_admin_user, invalidate_user, user_cache,
+    USER_CACHE_TTL, USER_CACHE_TTL_WATCHED,
+    oauth2_scheme, ACCESS_TOKEN_EXPIRE_MINUTES, BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
 )
+from availability import (
+    flatten_availability, find_booked_omissions, get_availability, get_calendar, replace_slots, delete_slots,
+    reserve_slot, release_slot
+)
+from pagination import MAX_PAGE_SIZE, encode_cursor, decode_cursor
+from cache import TTLCache, cached_response, etag_response
+from ratelimit import TokenBucketLimiter
+from changestreams import ChangeStreamWatcher
+from database import make_client, get_db, catalog_read_preference, ping, warm_up
+import metrics
+from serialization import (
+    EXPERIENCE, EXPERIENCE_LIST, EXPERIENCE_SUMMARY_LIST, BOOKING, BOOKING_LIST,
+    dump_models, model_response
+)
+from indexes import ensure_indexes, find_collection_scans
+from counters import allocate_ids, sync_counter
+from search import FIELD_WEIGHTS, SearchIndex
+from pricing import MAX_QUOTES, pricing_version, expand_quote_grid, price_grid, quote_booking, quote_grid_size, booking_type_error
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, bound by the app's lifespan handler (see create_app).
+# catalog_db may read from secondaries; everything else uses db.
+client = None
+db = None
+catalog_db = None
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get("MONGO_WARMUP_CONNECTIONS", os.environ.get("MONGO_MIN_POOL_SIZE", 10)))
+READINESS_TIMEOUT = float(os.environ.get("READINESS_TIMEOUT", 2))
+# Cross-worker cache invalidation; needs a replica set, else caches use TTLs
+CACHE_CHANGE_STREAMS = os.environ.get("CACHE_CHANGE_STREAMS", "1") != "0"
 
-# Create the main app without a prefix
-app = FastAPI()
+# Catalog reads are cached per worker; admin writes invalidate the whole
+# cache. Other workers hear about writes through change streams, and get the
+# longer TTL only while those streams are live.
+CATALOG_CACHE_TTL = float(os.environ.get("CATALOG_CACHE_TTL", 300))
+CATALOG_CACHE_TTL_WATCHED = float(os.environ.get("CATALOG_CACHE_TTL_WATCHED", 3600))
+catalog_cache = TTLCache(
+    maxsize=int(os.environ.get("CATALOG_CACHE_SIZE", 512)),
+    ttl=CATALOG_CACHE_TTL
+)
+# Per-worker full-text index, updated in place by the admin experience routes.
+# Other workers' edits arrive through the experiences change stream; while
+# that isn't live the index is rebuilt once it's CATALOG_CACHE_TTL old.
+search_index = SearchIndex()
+search_index_built = 0.0
+search_index_lock = asyncio.Lock()
+# Quote grids are keyed by pricing version, so edits never need to purge them
+quote_cache = TTLCache(
+    maxsize=int(os.environ.get("QUOTE_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("QUOTE_CACHE_TTL", 3600))
+)
+# Admission control for the bcrypt-backed auth routes, per worker. Client
+# IPs come from request.client, so run uvicorn with --proxy-headers behind
+# the ingress.
+auth_limiters = {
+    "login_ip": TokenBucketLimiter(
+        rate_per_minute=float(os.environ.get("LOGIN_IP_RATE", 30)),
+        burst=int(os.environ.get("LOGIN_IP_BURST", 10))
+    ),
+    "login_email": TokenBucketLimiter(
+        rate_per_minute=float(os.environ.get("LOGIN_EMAIL_RATE", 6)),
+        burst=int(os.environ.get("LOGIN_EMAIL_BURST", 5))
+    ),
+    "register_ip": TokenBucketLimiter(
+        rate_per_minute=float(os.environ.get("REGISTER_IP_RATE", 6)),
+        burst=int(os.environ.get("REGISTER_IP_BURST", 5))
+    ),
+    "register_email": TokenBucketLimiter(
+        rate_per_minute=float(os.environ.get("REGISTER_EMAIL_RATE", 3)),
+        burst=int(os.environ.get("REGISTER_EMAIL_BURST", 3))
+    ),
+}
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -42,10 +120,34 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# ============ AUTH DEPENDENCIES ============
+
+async def current_user(token: str = Depends(oauth2_scheme)) -> User:
+    return await get_current_user(token, db)
+
+async def current_admin_user(user: User = Depends(current_user)) -> User:
+    return await get_current_admin_user(user)
+
+def admit(route: str, request: Request, email: str):
+    # Runs before any DB lookup or hashing, so a rejected request costs
+    # next to nothing
+    client_ip = request.client.host if request.client else "unknown"
+    for name, key in ((f"{route}_ip", client_ip), (f"{route}_email", email.lower())):
+        retry_after = auth_limiters[name].acquire(key)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
 # ============ AUTH ROUTES ============
 
 @api_router.post("/auth/register", response_model=Token)
-async def register(user: UserCreate):
+async def register(user: UserCreate, request: Request):
+    admit("register", request, user.email)
+    
     # Check if user exists
     existing_user = await db.users.find_one({"email": user.email})
     if existing_user:
@@ -55,12 +157,20 @@ async def register(user: UserCreate):
         )
     
     # Create user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     user_dict = user.dict()
     del user_dict['password']
     
     user_in_db = UserInDB(**user_dict, hashed_password=hashed_password)
-    await db.users.insert_one(user_in_db.dict())
+    try:
+        await db.users.insert_one(user_in_db.dict())
+    except DuplicateKeyError:
+        # A concurrent registration won the unique email index
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    invalidate_user(user.email)
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -70,7 +180,9 @@ async def register(user: UserCreate):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @api_router.post("/auth/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    admit("login", request, form_data.username)
+    
     user = await db.users.find_one({"email": form_data.username})
     if not user:
         raise HTTPException(
@@ -79,12 +191,19 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not verify_password(form_data.password, user["hashed_password"]):
+    valid, new_hash = await verify_and_update_password(form_data.password, user["hashed_password"])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Transparently move the stored hash to the current bcrypt cost
+        await db.users.update_one(
+            {"email": user["email"]},
+            {"$set": {"hashed_password": new_hash}}
+        )
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -93,19 +212,52 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @api_router.get("/auth/me", response_model=User)
-async def get_me(current_user: User = Depends(lambda token: get_current_user(token, db))):
+async def get_me(current_user: User = Depends(current_user)):
     return current_user
 
 
 # ============ EXPERIENCE ROUTES ============
 
-@api_router.get("/experiences", response_model=List[Experience])
-async def get_experiences(
-    category: Optional[str] = None,
-    location: Optional[str] = None,
-    min_price: Optional[int] = None,
-    max_price: Optional[int] = None
-):
+MAX_BULK_EXPERIENCES = 5000
+DEFAULT_BOOKING_TYPES = ["private", "shared", "group"]
+# Lower bounds of the price facet buckets; the last one is open-ended
+PRICE_BUCKETS = [0, 1500, 2500, 3500, 5000]
+MAX_CALENDAR_DAYS = 366
+SUMMARY_PROJECTION = {"_id": 0, **{field: 1 for field in ExperienceSummary.model_fields}}
+SEARCH_PROJECTION = {**SUMMARY_PROJECTION, **{field: 1 for field in FIELD_WEIGHTS}}
+
+def _index_experience(experience: dict):
+    search_index.upsert(experience, ExperienceSummary(**experience).model_dump())
+
+async def rebuild_search_index():
+    # Filled off to the side, so searches never see a half-built index
+    global search_index, search_index_built
+    started = time.monotonic()
+    index = SearchIndex()
+    async for experience in catalog_db.experiences.find({}, SEARCH_PROJECTION):
+        index.upsert(experience, ExperienceSummary(**experience).model_dump())
+    search_index, search_index_built = index, started
+
+def _search_index_stale() -> bool:
+    watcher = cache_watchers.get("experiences")
+    if watcher and watcher.live:
+        return False
+    return time.monotonic() - search_index_built > CATALOG_CACHE_TTL
+
+async def current_search_index() -> SearchIndex:
+    if _search_index_stale():
+        async with search_index_lock:
+            # Whoever waited on the lock finds it already rebuilt
+            if _search_index_stale():
+                await rebuild_search_index()
+    return search_index
+
+def _experience_filters(
+    category: Optional[str],
+    location: Optional[str],
+    min_price: Optional[int],
+    max_price: Optional[int]
+) -> dict:
     query = {}
     if category:
         query["category"] = category
@@ -117,203 +269,647 @@ async def get_experiences(
             query["price"]["$gte"] = min_price
         if max_price is not None:
             query["price"]["$lte"] = max_price
+    return query
+
+@api_router.get("/experiences", response_model=List[Union[Experience, ExperienceSummary]])
+async def get_experiences(
+    request: Request,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    view: Literal["full", "summary"] = "full",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    cache_key = ("experiences", category, location, min_price, max_price, view, limit, cursor)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+    
+    query = _experience_filters(category, location, min_price, max_price)
+    
+    # Keyset pagination on the unique id; the cursor is the last id served
+    if cursor:
+        last_id = decode_cursor(cursor).get("id")
+        # bool is an int too, and {"$gt": None} would quietly match nothing
+        if not isinstance(last_id, int) or isinstance(last_id, bool):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["id"] = {"$gt": last_id}
+    
+    # Listing never ships slot inventory; that lives in db.slots
+    if view == "summary":
+        adapter, projection = EXPERIENCE_SUMMARY_LIST, SUMMARY_PROJECTION
+    else:
+        adapter, projection = EXPERIENCE_LIST, {"availability": 0}
     
-    experiences = await db.experiences.find(query).to_list(1000)
-    return [Experience(**exp) for exp in experiences]
+    headers = {}
+    experiences_cursor = catalog_db.experiences.find(query, projection).sort("id", 1)
+    if limit:
+        experiences = await experiences_cursor.limit(limit + 1).to_list(limit + 1)
+        if len(experiences) > limit:
+            experiences = experiences[:limit]
+            headers["X-Next-Cursor"] = encode_cursor({"id": experiences[-1]["id"]})
+    else:
+        experiences = await experiences_cursor.to_list(1000)
+    
+    cached = cached_response(dump_models(adapter, experiences), headers)
+    catalog_cache.set(cache_key, cached)
+    return etag_response(request, cached)
+
+def _count_by(field: str) -> list:
+    return [
+        {"$group": {"_id": field, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}}
+    ]
+
+@api_router.get("/experiences/facets", response_model=ExperienceFacets)
+async def get_experience_facets(
+    request: Request,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None
+):
+    cache_key = ("facets", category, location, min_price, max_price)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+    
+    # Every facet in one pass over the filtered catalog
+    result = await catalog_db.experiences.aggregate([
+        {"$match": _experience_filters(category, location, min_price, max_price)},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "category": _count_by("$category"),
+            "location": _count_by("$location"),
+            "bookingTypes": [
+                {"$project": {"bookingType": {"$ifNull": ["$bookingTypes", DEFAULT_BOOKING_TYPES]}}},
+                {"$unwind": "$bookingType"},
+                *_count_by("$bookingType")
+            ],
+            "price": [
+                {"$bucket": {
+                    "groupBy": "$price",
+                    "boundaries": PRICE_BUCKETS,
+                    "default": "above",
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ],
+            "priceRange": [
+                {"$group": {"_id": None, "min": {"$min": "$price"}, "max": {"$max": "$price"}}}
+            ]
+        }}
+    ]).to_list(1)
+    facets = result[0]
+    
+    bucket_counts = {bucket["_id"]: bucket["count"] for bucket in facets["price"]}
+    price_buckets = [
+        {"min": low, "max": high, "count": bucket_counts.get(low, 0)}
+        for low, high in zip(PRICE_BUCKETS, PRICE_BUCKETS[1:])
+    ]
+    price_buckets.append({"min": PRICE_BUCKETS[-1], "max": None, "count": bucket_counts.get("above", 0)})
+    price_range = facets["priceRange"][0] if facets["priceRange"] else {"min": None, "max": None}
+    
+    facets = ExperienceFacets(
+        total=facets["total"][0]["count"] if facets["total"] else 0,
+        category=[FacetCount(value=c["_id"], count=c["count"]) for c in facets["category"]],
+        location=[FacetCount(value=c["_id"], count=c["count"]) for c in facets["location"]],
+        bookingTypes=[FacetCount(value=c["_id"], count=c["count"]) for c in facets["bookingTypes"]],
+        price=price_buckets,
+        minPrice=price_range["min"],
+        maxPrice=price_range["max"]
+    )
+    cached = cached_response(facets.model_dump_json().encode())
+    catalog_cache.set(cache_key, cached)
+    return etag_response(request, cached)
+
+@api_router.get("/experiences/search", response_model=List[ExperienceSearchResult])
+async def search_experiences(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE)
+):
+    return (await current_search_index()).search(q, limit)
+
+@api_router.get("/experiences/suggest", response_model=List[ExperienceSuggestion])
+async def suggest_experiences(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20)
+):
+    return (await current_search_index()).suggest(q, limit)
 
 @api_router.get("/experiences/{experience_id}", response_model=Experience)
-async def get_experience(experience_id: int):
-    experience = await db.experiences.find_one({"id": experience_id})
+async def get_experience(experience_id: int, request: Request):
+    cache_key = ("experience", experience_id)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(request, cached)
+    
+    experience = await catalog_db.experiences.find_one({"id": experience_id}, {"availability": 0})
     if not experience:
         raise HTTPException(status_code=404, detail="Experience not found")
-    return Experience(**experience)
+    experience["availability"] = await get_availability(db, experience_id)
+    
+    cached = cached_response(dump_models(EXPERIENCE, experience))
+    catalog_cache.set(cache_key, cached)
+    return etag_response(request, cached)
+
+@api_router.get(
+    "/experiences/{experience_id}/availability",
+    response_model=AvailabilityCalendar,
+    response_model_by_alias=True
+)
+async def get_experience_availability(
+    experience_id: int,
+    from_: Optional[str] = Query(None, alias="from"),
+    to: Optional[str] = None,
+    type: Optional[str] = None
+):
+    try:
+        start = date.fromisoformat(from_) if from_ else date.today()
+        end = date.fromisoformat(to) if to else start + timedelta(days=30)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    if end < start or (end - start).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range must be between 1 and {MAX_CALENDAR_DAYS} days"
+        )
+    
+    if not await catalog_db.experiences.find_one({"id": experience_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Experience not found")
+    return await get_calendar(db, experience_id, start, end, type)
 
 @api_router.post("/experiences", response_model=Experience)
 async def create_experience(
     experience: ExperienceCreate,
-    current_user: User = Depends(lambda token: get_current_admin_user(get_current_user(token, db)))
+    current_user: User = Depends(current_admin_user)
 ):
-    # Get max id
-    max_exp = await db.experiences.find_one(sort=[("id", -1)])
-    new_id = (max_exp["id"] + 1) if max_exp else 1
+    new_id = await allocate_ids(db, "experiences")
     
     exp_dict = experience.dict()
     exp_dict["id"] = new_id
+    availability = exp_dict.pop("availability") or []
     
     await db.experiences.insert_one(exp_dict)
+    await replace_slots(db, new_id, availability)
+    catalog_cache.invalidate()
+    _index_experience(exp_dict)
+    exp_dict["availability"] = availability
     return Experience(**exp_dict)
 
+@api_router.post("/experiences/bulk")
+async def create_experiences_bulk(
+    experiences: List[ExperienceCreate],
+    current_user: User = Depends(current_admin_user)
+):
+    if len(experiences) > MAX_BULK_EXPERIENCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many experiences in one request (max {MAX_BULK_EXPERIENCES})"
+        )
+    if not experiences:
+        return {"inserted_count": 0, "ids": [], "errors": []}
+    
+    # One counter round trip for the whole block of ids
+    first_id = await allocate_ids(db, "experiences", len(experiences))
+    exp_dicts, slots = [], []
+    for offset, experience in enumerate(experiences):
+        exp_dict = experience.dict()
+        exp_dict["id"] = first_id + offset
+        slots.extend(flatten_availability(exp_dict["id"], exp_dict.pop("availability") or []))
+        exp_dicts.append(exp_dict)
+    
+    errors = []
+    try:
+        await db.experiences.insert_many(exp_dicts, ordered=False)
+    except BulkWriteError as e:
+        errors = [
+            {"id": exp_dicts[error["index"]]["id"], "message": error["errmsg"]}
+            for error in e.details["writeErrors"]
+        ]
+    failed_ids = {error["id"] for error in errors}
+    slots = [slot for slot in slots if slot["experience_id"] not in failed_ids]
+    if slots:
+        try:
+            await db.slots.insert_many(slots, ordered=False)
+        except BulkWriteError as e:
+            # The experiences are already in; report the slots that didn't make it
+            errors.extend(
+                {"id": slots[error["index"]]["experience_id"], "message": error["errmsg"]}
+                for error in e.details["writeErrors"]
+            )
+    catalog_cache.invalidate()
+    for exp_dict in exp_dicts:
+        if exp_dict["id"] not in failed_ids:
+            _index_experience(exp_dict)
+    
+    return {
+        "inserted_count": len(exp_dicts) - len(failed_ids),
+        "ids": [exp["id"] for exp in exp_dicts if exp["id"] not in failed_ids],
+        "errors": errors
+    }
+
 @api_router.put("/experiences/{experience_id}", response_model=Experience)
 async def update_experience(
     experience_id: int,
     experience: ExperienceUpdate,
-    current_user: User = Depends(lambda token: get_current_admin_user(get_current_user(token, db)))
+    current_user: User = Depends(current_admin_user)
 ):
-    existing = await db.experiences.find_one({"id": experience_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Experience not found")
-    
     update_data = {k: v for k, v in experience.dict().items() if v is not None}
+    availability = update_data.pop("availability", None)
+    if availability is not None:
+        # The list replaces what's published, but never drops a booked seat
+        booked = await find_booked_omissions(db, experience_id, availability)
+        if booked:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Slots with bookings can't be removed: " + ", ".join(
+                    f"{slot['date']} {slot['time']} {slot['bookingType']}" for slot in booked[:10]
+                )
+            )
     if update_data:
-        await db.experiences.update_one({"id": experience_id}, {"$set": update_data})
+        updated = await db.experiences.find_one_and_update(
+            {"id": experience_id},
+            {"$set": update_data},
+            projection={"availability": 0},
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        updated = await db.experiences.find_one({"id": experience_id}, {"availability": 0})
+    if not updated:
+        raise HTTPException(status_code=404, detail="Experience not found")
     
-    updated = await db.experiences.find_one({"id": experience_id})
-    return Experience(**updated)
+    if availability is not None:
+        await replace_slots(db, experience_id, availability)
+    catalog_cache.invalidate()
+    _index_experience(updated)
+    updated["availability"] = await get_availability(db, experience_id)
+    return model_response(EXPERIENCE, updated)
 
 @api_router.delete("/experiences/{experience_id}")
 async def delete_experience(
     experience_id: int,
-    current_user: User = Depends(lambda token: get_current_admin_user(get_current_user(token, db)))
+    current_user: User = Depends(current_admin_user)
 ):
     result = await db.experiences.delete_one({"id": experience_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Experience not found")
+    await delete_slots(db, experience_id)
+    catalog_cache.invalidate()
+    search_index.remove(experience_id)
     return {"message": "Experience deleted successfully"}
 
 
+def _pricing_inputs(experience: dict):
+    # Same defaults the Experience model hands to the frontend
+    pricing = PricingStructure(**experience["pricing"]) if experience.get("pricing") else PricingStructure()
+    add_ons = [AddOn(**addon) for addon in experience.get("addOns") or []]
+    return pricing, add_ons
+
+@api_router.post("/experiences/{experience_id}/quotes", response_model=QuoteResponse)
+async def get_quotes(experience_id: int, quote_request: QuoteRequest):
+    experience = await db.experiences.find_one(
+        {"id": experience_id}, {"pricing": 1, "addOns": 1}
+    )
+    if not experience:
+        raise HTTPException(status_code=404, detail="Experience not found")
+    
+    version = pricing_version(experience.get("pricing"), experience.get("addOns"))
+    cache_key = (experience_id, version, quote_request.model_dump_json())
+    cached = quote_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Size check first: the endpoint is public and the product grows fast
+    if quote_grid_size(quote_request) > MAX_QUOTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many combinations requested (max {MAX_QUOTES})"
+        )
+    grid = expand_quote_grid(quote_request)
+    
+    pricing, add_ons = _pricing_inputs(experience)
+    base, add_ons_price = price_grid(pricing, add_ons, grid) if grid else ([], [])
+    quotes = [
+        Quote(
+            booking_type=booking_type, adults=adults, kids=kids, group_size=group_size,
+            add_ons=extras, base_price=int(base_price), add_ons_price=int(extras_price),
+            total_price=int(base_price + extras_price)
+        )
+        for (booking_type, adults, kids, group_size, extras), base_price, extras_price
+        in zip(grid, base, add_ons_price)
+    ]
+    result = QuoteResponse(experience_id=experience_id, pricing_version=version, quotes=quotes)
+    quote_cache.set(cache_key, result)
+    return result
+
+
 # ============ BOOKING ROUTES ============
 
 @api_router.post("/bookings", response_model=Booking)
 async def create_booking(
     booking: BookingCreate,
-    current_user: User = Depends(lambda token: get_current_user(token, db))
+    current_user: User = Depends(current_user)
 ):
-    # Check availability and update capacity
-    experience = await db.experiences.find_one({"id": booking.experience_id})
+    experience = await db.experiences.find_one(
+        {"id": booking.experience_id}, {"pricing": 1, "addOns": 1}
+    )
     if not experience:
         raise HTTPException(status_code=404, detail="Experience not found")
     
-    # Find the time slot and check capacity
-    if experience.get("availability"):
-        for day_availability in experience["availability"]:
-            if day_availability["date"] == booking.date:
-                for slot in day_availability["timeSlots"]:
-                    if slot["time"] == booking.time and slot["bookingType"] == booking.booking_type:
-                        if slot["currentBookings"] >= slot["maxCapacity"]:
-                            raise HTTPException(
-                                status_code=status.HTTP_400_BAD_REQUEST,
-                                detail="This time slot is fully booked"
-                            )
-                        # Update capacity
-                        slot["currentBookings"] += 1
-                        if slot["currentBookings"] >= slot["maxCapacity"]:
-                            slot["available"] = False
-                        break
-        
-        # Update experience availability
-        await db.experiences.update_one(
-            {"id": booking.experience_id},
-            {"$set": {"availability": experience["availability"]}}
+    # The client-side price is only trusted if the server arrives at the same total
+    pricing, add_ons = _pricing_inputs(experience)
+    error = booking_type_error(pricing, booking.booking_type, booking.group_size)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    if abs(quote_booking(pricing, add_ons, booking) - booking.total_price) > 0.5:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Price does not match current pricing, please refresh and try again"
+        )
+    
+    # Reserve a seat atomically so concurrent checkouts can't oversell the slot
+    reserved = await reserve_slot(
+        db, booking.experience_id, booking.date, booking.time, booking.booking_type
+    )
+    if not reserved:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This time slot is fully booked"
         )
     
     booking_dict = booking.dict()
     booking_dict["user_id"] = current_user.id
     
     booking_obj = Booking(**booking_dict)
-    await db.bookings.insert_one(booking_obj.dict())
+    try:
+        await db.bookings.insert_one(booking_obj.dict())
+    except Exception:
+        await release_slot(
+            db, booking.experience_id, booking.date, booking.time, booking.booking_type
+        )
+        raise
+    finally:
+        # Seat counts are part of the cached experience detail
+        catalog_cache.discard(("experience", booking.experience_id))
     return booking_obj
 
 @api_router.get("/bookings", response_model=List[Booking])
 async def get_bookings(
-    current_user: User = Depends(lambda token: get_current_user(token, db))
+    current_user: User = Depends(current_user)
 ):
     bookings = await db.bookings.find({"user_id": current_user.id}).to_list(1000)
-    return [Booking(**booking) for booking in bookings]
+    return model_response(BOOKING_LIST, bookings)
 
 @api_router.get("/bookings/{booking_id}", response_model=Booking)
 async def get_booking(
     booking_id: str,
-    current_user: User = Depends(lambda token: get_current_user(token, db))
+    current_user: User = Depends(current_user)
 ):
     booking = await db.bookings.find_one({"id": booking_id, "user_id": current_user.id})
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
-    return Booking(**booking)
+    return model_response(BOOKING, booking)
 
 @api_router.put("/bookings/{booking_id}", response_model=Booking)
 async def update_booking(
     booking_id: str,
     booking_update: BookingUpdate,
-    current_user: User = Depends(lambda token: get_current_user(token, db))
+    current_user: User = Depends(current_user)
 ):
-    existing = await db.bookings.find_one({"id": booking_id, "user_id": current_user.id})
-    if not existing:
+    query = {"id": booking_id, "user_id": current_user.id}
+    update_data = {k: v for k, v in booking_update.dict().items() if v is not None}
+    # Seats are only taken and given back alongside the status, so letting it
+    # move freely here would let one seat be released twice
+    if "status" in update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Booking status can't be changed; cancel the booking instead"
+        )
+    if not update_data:
+        updated = await db.bookings.find_one(query)
+        if not updated:
+            raise HTTPException(status_code=404, detail="Booking not found")
+        return model_response(BOOKING, updated)
+    
+    current = await db.bookings.find_one(query)
+    if not current:
         raise HTTPException(status_code=404, detail="Booking not found")
+    guarded = False
     
-    update_data = {k: v for k, v in booking_update.dict().items() if v is not None}
-    if update_data:
-        from datetime import datetime
-        update_data["updated_at"] = datetime.utcnow()
-        await db.bookings.update_one({"id": booking_id}, {"$set": update_data})
+    # Different guests or extras cost a different amount, so the server reprices
+    # the merged booking rather than keeping the total paid for the old one
+    if "guests" in update_data or "add_ons" in update_data:
+        experience = await db.experiences.find_one(
+            {"id": current["experience_id"]}, {"pricing": 1, "addOns": 1}
+        )
+        if not experience:
+            raise HTTPException(status_code=404, detail="Experience not found")
+        pricing, add_ons = _pricing_inputs(experience)
+        merged = Booking(**{**current, **update_data})
+        error = booking_type_error(pricing, merged.booking_type, merged.group_size)
+        if error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+        update_data["total_price"] = quote_booking(pricing, add_ons, merged)
+        # The total is only right for the guests and extras it was computed from
+        query = {**query, "guests": current["guests"], "add_ons": current["add_ons"]}
+        guarded = True
     
-    updated = await db.bookings.find_one({"id": booking_id})
-    return Booking(**updated)
+    # Rescheduling takes a seat on the new slot before giving back the old one
+    moved = None
+    new_date = update_data.get("date", current["date"])
+    new_time = update_data.get("time", current["time"])
+    if (new_date, new_time) != (current["date"], current["time"]):
+        if current["status"] == "cancelled":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cancelled bookings can't be rescheduled"
+            )
+        reserved = await reserve_slot(
+            db, current["experience_id"], new_date, new_time, current["booking_type"]
+        )
+        if not reserved:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This time slot is fully booked"
+            )
+        moved = current
+        # Only applies if nobody cancelled or rescheduled the booking meanwhile
+        query = {
+            **query, "status": current["status"],
+            "date": current["date"], "time": current["time"]
+        }
+        guarded = True
+    
+    update_data["updated_at"] = datetime.utcnow()
+    updated = await db.bookings.find_one_and_update(
+        query, {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if moved:
+        # Give back whichever seat the booking doesn't hold
+        released = (moved["date"], moved["time"]) if updated else (new_date, new_time)
+        await release_slot(db, moved["experience_id"], *released, moved["booking_type"])
+        catalog_cache.discard(("experience", moved["experience_id"]))
+    if not updated and guarded:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking changed while updating, please try again"
+        )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return model_response(BOOKING, updated)
 
 @api_router.delete("/bookings/{booking_id}")
 async def cancel_booking(
     booking_id: str,
-    current_user: User = Depends(lambda token: get_current_user(token, db))
+    current_user: User = Depends(current_user)
 ):
-    existing = await db.bookings.find_one({"id": booking_id, "user_id": current_user.id})
-    if not existing:
+    query = {"id": booking_id, "user_id": current_user.id}
+    # Only the request that actually flips the status releases the seat
+    cancelled = await db.bookings.find_one_and_update(
+        {**query, "status": {"$ne": "cancelled"}},
+        {"$set": {"status": "cancelled"}},
+        projection={"experience_id": 1, "date": 1, "time": 1, "booking_type": 1}
+    )
+    if cancelled:
+        await release_slot(
+            db, cancelled["experience_id"], cancelled["date"],
+            cancelled["time"], cancelled["booking_type"]
+        )
+        catalog_cache.discard(("experience", cancelled["experience_id"]))
+    elif not await db.bookings.count_documents(query, limit=1):
+        # Already-cancelled bookings still succeed, like before
         raise HTTPException(status_code=404, detail="Booking not found")
+    return {"message": "Booking cancelled successfully"}
+
+
+# ============ ADMIN ROUTES ============
+
+# Newest first, with id as the tie-breaker so the keyset order is total
+BOOKING_SORT = [("created_at", -1), ("id", -1)]
+EXPORT_BATCH = 1000
+BOOKING_CSV_COLUMNS = [
+    "id", "created_at", "updated_at", "status", "user_id", "experience_id",
+    "experience_title", "booking_type", "date", "time", "adults", "kids",
+    "group_size", "customer_name", "customer_email", "customer_phone", "total_price"
+]
+
+def _stream_export(cursor, format: str, filename: str, csv_columns: List[str], csv_row=None) -> StreamingResponse:
+    async def batches():
+        # Yield one chunk per Mongo batch so memory stays flat however many documents there are
+        while True:
+            batch = await cursor.to_list(EXPORT_BATCH)
+            if not batch:
+                return
+            yield batch
     
-    # Release the time slot capacity
-    experience = await db.experiences.find_one({"id": existing["experience_id"]})
-    if experience and experience.get("availability"):
-        for day_availability in experience["availability"]:
-            if day_availability["date"] == existing["date"]:
-                for slot in day_availability["timeSlots"]:
-                    if slot["time"] == existing["time"] and slot["bookingType"] == existing["booking_type"]:
-                        slot["currentBookings"] = max(0, slot["currentBookings"] - 1)
-                        slot["available"] = True
-                        break
-        
-        # Update experience availability
-        await db.experiences.update_one(
-            {"id": existing["experience_id"]},
-            {"$set": {"availability": experience["availability"]}}
-        )
+    if format == "csv":
+        async def rows():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=csv_columns, extrasaction="ignore")
+            writer.writeheader()
+            async for batch in batches():
+                for document in batch:
+                    writer.writerow(csv_row(document) if csv_row else document)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        media_type, body = "text/csv", rows()
+    else:
+        async def lines():
+            async for batch in batches():
+                yield "".join(json.dumps(jsonable_encoder(document)) + "\n" for document in batch)
+        media_type, body = "application/x-ndjson", lines()
     
-    await db.bookings.update_one(
-        {"id": booking_id},
-        {"$set": {"status": "cancelled"}}
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{format}"}
     )
-    return {"message": "Booking cancelled successfully"}
 
+def _booking_csv_row(booking: dict) -> dict:
+    guests = booking.get("guests") or {}
+    return {**booking, "adults": guests.get("adults"), "kids": guests.get("kids")}
 
-# ============ ADMIN ROUTES ============
+def _admin_bookings_query(status: Optional[str], experience_id: Optional[int]) -> dict:
+    query = {}
+    if status:
+        query["status"] = status
+    if experience_id:
+        query["experience_id"] = experience_id
+    return query
 
 @api_router.get("/admin/bookings", response_model=List[Booking])
 async def get_all_bookings(
     status: Optional[str] = None,
     experience_id: Optional[int] = None,
-    current_user: User = Depends(lambda token: get_current_admin_user(get_current_user(token, db)))
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(current_admin_user)
 ):
-    query = {}
-    if status:
-        query["status"] = status
-    if experience_id:
-        query["experience_id"] = experience_id
+    query = _admin_bookings_query(status, experience_id)
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            created_at = datetime.fromisoformat(position["created_at"])
+            last_id = position["id"]
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": last_id}}
+        ]
     
-    bookings = await db.bookings.find(query).to_list(1000)
-    return [Booking(**booking) for booking in bookings]
+    headers = {}
+    bookings = await db.bookings.find(query).sort(BOOKING_SORT).limit(limit + 1).to_list(limit + 1)
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        headers["X-Next-Cursor"] = encode_cursor({
+            "created_at": bookings[-1]["created_at"].isoformat(),
+            "id": bookings[-1]["id"]
+        })
+    return model_response(BOOKING_LIST, bookings, headers)
+
+@api_router.get("/admin/bookings/export")
+async def export_bookings(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[str] = None,
+    experience_id: Optional[int] = None,
+    current_user: User = Depends(current_admin_user)
+):
+    cursor = db.bookings.find(
+        _admin_bookings_query(status, experience_id), {"_id": 0}
+    ).sort(BOOKING_SORT).batch_size(EXPORT_BATCH)
+    return _stream_export(cursor, format, "bookings", BOOKING_CSV_COLUMNS, _booking_csv_row)
 
 @api_router.get("/admin/stats")
 async def get_admin_stats(
-    current_user: User = Depends(lambda token: get_current_admin_user(get_current_user(token, db)))
+    current_user: User = Depends(current_admin_user)
 ):
-    total_bookings = await db.bookings.count_documents({})
-    confirmed_bookings = await db.bookings.count_documents({"status": "confirmed"})
-    cancelled_bookings = await db.bookings.count_documents({"status": "cancelled"})
-    
-    # Calculate total revenue
-    bookings = await db.bookings.find({"status": {"$in": ["confirmed", "completed"]}}).to_list(10000)
-    total_revenue = sum(booking.get("total_price", 0) for booking in bookings)
+    # One grouped pass over bookings, run alongside the other counts
+    bookings_by_status, total_experiences, total_users, total_subscribers = await asyncio.gather(
+        db.bookings.aggregate([
+            {"$group": {
+                "_id": "$status",
+                "count": {"$sum": 1},
+                "revenue": {"$sum": {"$ifNull": ["$total_price", 0]}}
+            }}
+        ]).to_list(None),
+        db.experiences.estimated_document_count(),
+        db.users.estimated_document_count(),
+        db.newsletter_subscribers.count_documents({"status": "active"})
+    )
+    by_status = {group["_id"]: group for group in bookings_by_status}
     
-    total_experiences = await db.experiences.count_documents({})
-    total_users = await db.users.count_documents({})
-    total_subscribers = await db.newsletter_subscribers.count_documents({"status": "active"})
+    total_bookings = sum(group["count"] for group in bookings_by_status)
+    confirmed_bookings = by_status.get("confirmed", {}).get("count", 0)
+    cancelled_bookings = by_status.get("cancelled", {}).get("count", 0)
+    total_revenue = sum(
+        by_status.get(booking_status, {}).get("revenue", 0)
+        for booking_status in ("confirmed", "completed")
+    )
     
     return {
         "total_bookings": total_bookings,
@@ -326,51 +922,303 @@ async def get_admin_stats(
     }
 
 
+@api_router.get("/admin/cache/stats")
+async def get_cache_stats(current_user: User = Depends(current_admin_user)):
+    return {
+        "catalog": catalog_cache.stats(),
+        "quotes": quote_cache.stats(),
+        "users": user_cache.stats(),
+        "change_streams": {name: watcher.stats() for name, watcher in cache_watchers.items()}
+    }
+
+@api_router.get("/admin/auth/stats")
+async def get_auth_stats(current_user: User = Depends(current_admin_user)):
+    return {
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "hash_workers": PASSWORD_HASH_WORKERS,
+        "password_hashing": hash_stats,
+        "rate_limits": {name: limiter.stats() for name, limiter in auth_limiters.items()}
+    }
+
+
 # ============ NEWSLETTER ROUTES ============
 
+NEWSLETTER_IMPORT_BATCH = 1000
+NEWSLETTER_CSV_COLUMNS = ["email", "status", "subscribed_at", "id"]
+MAX_IMPORT_ERRORS = 100
+
 @api_router.post("/newsletter/subscribe", response_model=NewsletterSubscriber)
 async def subscribe_newsletter(subscriber: NewsletterSubscribe):
-    # Check if already subscribed
-    existing = await db.newsletter_subscribers.find_one({"email": subscriber.email})
-    if existing:
-        if existing.get("status") == "active":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already subscribed"
+    # One upsert on the unique email index: inserts new emails, reactivates
+    # unsubscribed ones, and collides with the index for active ones
+    new_subscriber = NewsletterSubscriber(email=subscriber.email)
+    try:
+        subscribed = await db.newsletter_subscribers.find_one_and_update(
+            {"email": subscriber.email, "status": {"$ne": "active"}},
+            {
+                "$set": {"status": "active", "subscribed_at": new_subscriber.subscribed_at},
+                "$setOnInsert": {"id": new_subscriber.id},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already subscribed"
+        )
+    return NewsletterSubscriber(**subscribed)
+
+@api_router.post("/admin/newsletter/import")
+async def import_newsletter_subscribers(
+    file: UploadFile = File(...),
+    current_user: User = Depends(current_admin_user)
+):
+    """Add every email in a CSV upload (needs an "email" column).
+
+    Rows are read from the spooled upload and written in batches of upserts,
+    so file size doesn't matter. Existing subscribers are left untouched;
+    in particular, people who unsubscribed are not re-subscribed.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+    try:
+        fieldnames = reader.fieldnames or []
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=400, detail="File must be a UTF-8 encoded CSV")
+    email_column = next(
+        (column for column in fieldnames if column.strip().lower() == "email"), None
+    )
+    if not email_column:
+        raise HTTPException(status_code=400, detail="CSV must have an email column")
+    
+    result = {"processed": 0, "inserted": 0, "existing": 0, "invalid": 0, "errors": []}
+    batch = {}
+    
+    async def flush():
+        if not batch:
+            return
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"email": email},
+                {"$setOnInsert": {"id": str(uuid.uuid4()), "subscribed_at": now, "status": "active"}},
+                upsert=True
             )
-        else:
-            # Reactivate subscription
-            await db.newsletter_subscribers.update_one(
-                {"email": subscriber.email},
-                {"$set": {"status": "active", "subscribed_at": datetime.utcnow()}}
+            for email in batch
+        ]
+        try:
+            written = await db.newsletter_subscribers.bulk_write(operations, ordered=False)
+            inserted = written.upserted_count
+        except BulkWriteError as e:
+            # Lost a race with a concurrent subscribe; that row exists anyway
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            inserted = e.details["nUpserted"]
+        result["inserted"] += inserted
+        result["existing"] += len(batch) - inserted
+        batch.clear()
+    
+    # Row 1 is the header
+    rows = enumerate(reader, start=2)
+    while True:
+        try:
+            row_number, row = next(rows)
+        except StopIteration:
+            break
+        except (UnicodeDecodeError, csv.Error):
+            # Earlier batches are already written; say how far the import got
+            await flush()
+            raise HTTPException(
+                status_code=400,
+                detail=f"File must be a UTF-8 encoded CSV (stopped after {result['processed']} rows, "
+                       f"{result['inserted']} subscribers added)"
             )
-            updated = await db.newsletter_subscribers.find_one({"email": subscriber.email})
-            return NewsletterSubscriber(**updated)
+        result["processed"] += 1
+        raw_email = (row.get(email_column) or "").strip()
+        try:
+            email = NewsletterSubscribe(email=raw_email).email
+        except ValidationError:
+            result["invalid"] += 1
+            if len(result["errors"]) < MAX_IMPORT_ERRORS:
+                result["errors"].append({"row": row_number, "email": raw_email, "message": "Invalid email"})
+            continue
+        if email in batch:
+            result["existing"] += 1
+            continue
+        batch[email] = None
+        if len(batch) >= NEWSLETTER_IMPORT_BATCH:
+            await flush()
+    await flush()
     
-    # Create new subscription
-    sub_obj = NewsletterSubscriber(email=subscriber.email)
-    await db.newsletter_subscribers.insert_one(sub_obj.dict())
-    return sub_obj
+    return result
+
+@api_router.get("/admin/newsletter/export")
+async def export_newsletter_subscribers(
+    format: Literal["ndjson", "csv"] = "csv",
+    status: Optional[str] = "active",
+    current_user: User = Depends(current_admin_user)
+):
+    cursor = db.newsletter_subscribers.find(
+        {"status": status} if status else {}, {"_id": 0}
+    ).batch_size(EXPORT_BATCH)
+    return _stream_export(cursor, format, "newsletter_subscribers", NEWSLETTER_CSV_COLUMNS)
 
 @api_router.get("/admin/newsletter/subscribers", response_model=List[NewsletterSubscriber])
 async def get_newsletter_subscribers(
-    current_user: User = Depends(lambda token: get_current_admin_user(get_current_user(token, db)))
+    current_user: User = Depends(current_admin_user)
 ):
     subscribers = await db.newsletter_subscribers.find({"status": "active"}).to_list(10000)
     return [NewsletterSubscriber(**sub) for sub in subscribers]
 
 
-# Include the router in the main app
-app.include_router(api_router)
+# ============ CACHE COHERENCE ============
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# One watcher per collection behind a local cache, filled by the lifespan handler
+cache_watchers = {}
+WRITE_EVENTS = {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}
+
+def _apply_cache_ttls():
+    # Detail entries embed slot availability, so the catalog needs both streams
+    catalog_watched = all(
+        name in cache_watchers and cache_watchers[name].live for name in ("experiences", "slots")
+    )
+    catalog_cache.ttl = CATALOG_CACHE_TTL_WATCHED if catalog_watched else CATALOG_CACHE_TTL
+    users_watched = "users" in cache_watchers and cache_watchers["users"].live
+    user_cache.ttl = USER_CACHE_TTL_WATCHED if users_watched else USER_CACHE_TTL
+
+async def _on_experience_change(change: dict):
+    catalog_cache.invalidate()
+    if change["operationType"] == "delete":
+        # Delete events only carry _id; deletes are rare enough to rebuild
+        await rebuild_search_index()
+    elif change.get("fullDocument"):
+        _index_experience(change["fullDocument"])
+
+async def _on_experiences_live(live: bool):
+    _apply_cache_ttls()
+    catalog_cache.invalidate()
+    if live:
+        await rebuild_search_index()
+
+async def _on_slot_change(change: dict):
+    slot = change.get("fullDocument")
+    if slot:
+        catalog_cache.discard(("experience", slot["experience_id"]))
+    else:
+        catalog_cache.invalidate()
+
+async def _on_slots_live(live: bool):
+    _apply_cache_ttls()
+    catalog_cache.invalidate()
+
+async def _on_user_change(change: dict):
+    user = change.get("fullDocument")
+    invalidate_user(user["email"] if user else None)
+
+async def _on_users_live(live: bool):
+    _apply_cache_ttls()
+    invalidate_user()
+
+def _start_cache_watchers() -> List[asyncio.Task]:
+    cache_watchers.update({
+        "experiences": ChangeStreamWatcher(
+            db.experiences, _on_experience_change, _on_experiences_live,
+            pipeline=[WRITE_EVENTS, {"$project": {
+                "operationType": 1,
+                **{f"fullDocument.{field}": 1 for field in SEARCH_PROJECTION if field != "_id"}
+            }}],
+            full_document="updateLookup"
+        ),
+        "slots": ChangeStreamWatcher(
+            db.slots, _on_slot_change, _on_slots_live,
+            pipeline=[WRITE_EVENTS, {"$project": {"operationType": 1, "fullDocument.experience_id": 1}}],
+            full_document="updateLookup"
+        ),
+        "users": ChangeStreamWatcher(
+            db.users, _on_user_change, _on_users_live,
+            pipeline=[WRITE_EVENTS, {"$project": {"operationType": 1, "fullDocument.email": 1}}],
+            full_document="updateLookup"
+        ),
+    })
+    return [asyncio.create_task(watcher.run()) for watcher in cache_watchers.values()]
+
+
+# ============ HEALTH ============
+
+@api_router.get("/health/ready")
+async def readiness(request: Request):
+    # Not ready until the lifespan handler has warmed the pool, and not
+    # while Mongo is unreachable
+    if not request.app.state.ready:
+        raise HTTPException(status_code=503, detail="Starting up")
+    try:
+        await ping(client, READINESS_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Readiness ping failed: {e}")
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return {"status": "ready"}
+
+async def get_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# ============ APP ============
+
+def _bind_client(mongo_client):
+    global client, db, catalog_db
+    client = mongo_client
+    db = get_db(mongo_client)
+    catalog_db = get_db(mongo_client, catalog_read_preference())
+
+async def _startup():
+    await ensure_indexes(db)
+    await sync_counter(db, "experiences", "experiences")
+    await rebuild_search_index()
+    if os.environ.get("VERIFY_INDEXES"):
+        for collection, query, sort in await find_collection_scans(db):
+            logger.warning(f"Query still does a COLLSCAN on {collection}: {query} sort={sort}")
+
+def create_app(mongo_client=None) -> FastAPI:
+    """Build the API. Without ``mongo_client`` the app makes, warms up and
+    closes its own client; pass one in to share or fake the database."""
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        own_client = mongo_client is None
+        if own_client:
+            _bind_client(make_client(event_listeners=[metrics.MongoCommandMetrics()]))
+            elapsed = await warm_up(client, MONGO_WARMUP_CONNECTIONS)
+            logger.info(f"MongoDB pool warmed with {MONGO_WARMUP_CONNECTIONS} connections in {elapsed * 1000:.0f}ms")
+        else:
+            _bind_client(mongo_client)
+        await _startup()
+        watcher_tasks = _start_cache_watchers() if CACHE_CHANGE_STREAMS else []
+        app.state.ready = True
+        try:
+            yield
+        finally:
+            app.state.ready = False
+            for task in watcher_tasks:
+                task.cancel()
+            await asyncio.gather(*watcher_tasks, return_exceptions=True)
+            cache_watchers.clear()
+            _apply_cache_ttls()
+            if own_client:
+                client.close()
+    
+    app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+    app.state.ready = False
+    app.include_router(api_router)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
+    )
+    # Outermost, so it also times CORS handling
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.add_api_route("/metrics", get_metrics, include_in_schema=False)
+    return app
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+app = create_app()
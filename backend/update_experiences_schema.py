@@ -1,89 +1,16 @@
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+from database import get_db, make_client
+from models import PricingStructure
+from pricing import DEFAULT_ADD_ONS
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-default_pricing = {
-    "private": {
-        "enabled": True,
-        "firstAdult": 3600,
-        "additionalAdult": 2200,
-        "child": 1500
-    },
-    "shared": {
-        "enabled": True,
-        "adult": 2500,
-        "child": 1700
-    },
-    "group": {
-        "enabled": True,
-        "tier1": {"min": 10, "max": 17, "pricePerPerson": 2200},
-        "tier2": {"min": 18, "max": 25, "pricePerPerson": 2000}
-    }
-}
-
-default_addons = [
-    {
-        "id": "addon-1",
-        "name": "Pickup & Drop Off - Vijayawada",
-        "description": "Round trip from Vijayawada",
-        "price": 1800,
-        "calculationType": "per_3_guests",
-        "active": True
-    },
-    {
-        "id": "addon-2",
-        "name": "Pickup & Drop Off - Guntur",
-        "description": "Round trip from Guntur",
-        "price": 2300,
-        "calculationType": "per_3_guests",
-        "active": True
-    },
-    {
-        "id": "addon-3",
-        "name": "Special Puja Tickets",
-        "description": "VIP temple access",
-        "price": 500,
-        "calculationType": "per_person",
-        "active": True
-    },
-    {
-        "id": "addon-4",
-        "name": "Souvenir Kits",
-        "description": "Cultural memory kits",
-        "price": 1000,
-        "calculationType": "per_adult",
-        "active": True
-    },
-    {
-        "id": "addon-5",
-        "name": "Photography / Reels",
-        "description": "10 photos + 2 reels",
-        "price": 1500,
-        "calculationType": "flat",
-        "active": True
-    }
-]
-
-default_availability = [
-    {
-        "date": "2025-02-15",
-        "timeSlots": [
-            {"time": "09:00", "available": True},
-            {"time": "10:00", "available": True},
-            {"time": "14:00", "available": True},
-            {"time": "15:00", "available": True}
-        ]
-    }
-]
+client = make_client()
+db = get_db(client)
 
 async def update_schema():
     print("Updating experiences schema...")
@@ -94,9 +21,8 @@ async def update_schema():
         {
             "$set": {
                 "bookingTypes": ["private", "shared", "group"],
-                "pricing": default_pricing,
-                "addOns": default_addons,
-                "availability": default_availability
+                "pricing": PricingStructure().dict(),
+                "addOns": DEFAULT_ADD_ONS
             }
         }
     )
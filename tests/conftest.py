@@ -0,0 +1,92 @@
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Set before the backend modules read them at import time
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "andhra_darsan_test")
+# mongomock can't open change streams
+os.environ["CACHE_CHANGE_STREAMS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["MONGO_WARMUP_CONNECTIONS"] = "1"
+for limiter in ("LOGIN_IP", "LOGIN_EMAIL", "REGISTER_IP", "REGISTER_EMAIL"):
+    os.environ[f"{limiter}_BURST"] = "1000"
+
+import server  # noqa: E402
+from auth import create_access_token, invalidate_user  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def api():
+    """The app on a fresh in-memory database, driven in-process."""
+    app = server.create_app(AsyncMongoMockClient())
+    async with app.router.lifespan_context(app):
+        # Module-level caches outlive each app instance
+        server.catalog_cache.invalidate()
+        server.quote_cache.invalidate()
+        invalidate_user()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+@pytest.fixture
+def db(api):
+    return server.db
+
+@pytest.fixture
+async def admin_headers(db):
+    await db.users.insert_one({
+        "id": "admin", "email": "admin@example.com", "name": "Admin", "phone": "9999999999",
+        "is_admin": True, "hashed_password": "unused", "created_at": datetime.utcnow(),
+    })
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+
+@pytest.fixture
+def register(api):
+    async def register(email: str = "traveller@example.com"):
+        response = await api.post("/api/auth/register", json={
+            "email": email, "name": "Traveller", "phone": "9876543210", "password": "secret-password"
+        })
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return register
+
+def experience_payload(**overrides) -> dict:
+    payload = {
+        "title": "Kondapalli Toy Makers Trail",
+        "category": "Handlooms & Handicrafts",
+        "location": "Kondapalli",
+        "duration": "3 hours",
+        "price": 2500,
+        "image": "https://images.example.com/cover.jpg",
+        "description": "Meet the artisans who carve Kondapalli toys.",
+        "highlights": ["Carving demo"],
+        "whoIsThisFor": "Families",
+        "included": ["Guide"],
+        "images": [],
+        "addOns": [],
+        "availability": [],
+    }
+    payload.update(overrides)
+    return payload
+
+def day(date: str, *slots) -> dict:
+    """One DayAvailability; slots are (time, bookingType, maxCapacity)."""
+    return {
+        "date": date,
+        "timeSlots": [
+            {"time": time, "bookingType": booking_type, "maxCapacity": capacity}
+            for time, booking_type, capacity in slots
+        ],
+    }
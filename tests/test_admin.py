@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def stored_booking(n: int, status: str, total_price=None) -> dict:
+    booking = {
+        "id": f"BD{n:04d}", "user_id": "user", "experience_id": 1, "experience_title": "x",
+        "booking_type": "shared", "date": "2030-01-01", "time": "10:00",
+        "guests": {"adults": 1, "kids": 0}, "group_size": None, "add_ons": {},
+        "customer_name": "x", "customer_email": "x@example.com", "customer_phone": "1",
+        "status": status, "created_at": datetime(2030, 1, 1), "updated_at": datetime(2030, 1, 1),
+    }
+    if total_price is not None:
+        booking["total_price"] = total_price
+    return booking
+
+
+async def test_stats_match_a_document_by_document_count(api, db, admin_headers):
+    bookings = [
+        *(stored_booking(n, "confirmed", 1000 + n) for n in range(7)),
+        *(stored_booking(n, "completed", 2500.5) for n in range(7, 10)),
+        *(stored_booking(n, "cancelled", 9999) for n in range(10, 14)),
+        # Older documents without a price count as 0
+        stored_booking(14, "confirmed"),
+    ]
+    await db.bookings.insert_many(bookings)
+    await db.experiences.insert_many([{"id": i} for i in range(1, 4)])
+    await db.newsletter_subscribers.insert_many([
+        {"email": f"reader{n}@example.com", "status": "active" if n % 3 else "unsubscribed"} for n in range(9)
+    ])
+
+    response = await api.get("/api/admin/stats", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "total_bookings": 15,
+        "confirmed_bookings": 8,
+        "cancelled_bookings": 4,
+        "total_revenue": sum(1000 + n for n in range(7)) + 3 * 2500.5,
+        "total_experiences": 3,
+        "total_users": 1,
+        "total_subscribers": 6,
+    }
+
+async def test_stats_on_an_empty_database(api, admin_headers):
+    response = await api.get("/api/admin/stats", headers=admin_headers)
+    assert response.json() == {
+        "total_bookings": 0, "confirmed_bookings": 0, "cancelled_bookings": 0, "total_revenue": 0,
+        "total_experiences": 0, "total_users": 1, "total_subscribers": 0,
+    }
+
+async def test_stats_need_an_admin(api, register):
+    response = await api.get("/api/admin/stats", headers=await register())
+    assert response.status_code == 403
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from passlib.context import CryptContext
+
+import auth
+import ratelimit
+import server
+from ratelimit import TokenBucketLimiter
+
+
+def bcrypt_hash(password: str, rounds: int) -> str:
+    return CryptContext(schemes=["bcrypt"]).hash(password, rounds=rounds)
+
+
+def test_stronger_stored_hashes_are_kept():
+    # A host configured with fewer rounds must not downgrade anyone
+    stored = bcrypt_hash("secret-password", auth.BCRYPT_ROUNDS + 1)
+    assert auth._verify_and_update("secret-password", stored) == (True, None)
+
+def test_weaker_stored_hashes_are_upgraded(monkeypatch):
+    stored = bcrypt_hash("secret-password", auth.BCRYPT_ROUNDS)
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", auth.BCRYPT_ROUNDS + 1)
+    valid, new_hash = auth._verify_and_update("secret-password", stored)
+    assert valid and new_hash is not None
+    assert auth.pwd_context.verify("secret-password", new_hash)
+
+def test_wrong_password_is_never_rehashed(monkeypatch):
+    stored = bcrypt_hash("secret-password", auth.BCRYPT_ROUNDS)
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", auth.BCRYPT_ROUNDS + 1)
+    assert auth._verify_and_update("wrong", stored) == (False, None)
+
+
+# ============ REGISTER ============
+
+@pytest.mark.anyio
+async def test_concurrent_registrations_for_one_email(api, db):
+    body = {"email": "twin@example.com", "name": "Twin", "phone": "9876543210", "password": "secret-password"}
+    responses = await asyncio.gather(*[api.post("/api/auth/register", json=body) for _ in range(4)])
+    assert sorted(response.status_code for response in responses) == [200, 400, 400, 400]
+    assert all(response.json()["detail"] == "Email already registered" for response in responses if response.status_code == 400)
+    assert await db.users.count_documents({"email": "twin@example.com"}) == 1
+
+
+# ============ USER CACHE ============
+
+@pytest.mark.anyio
+async def test_repeat_requests_resolve_the_user_from_the_cache(api, db, register):
+    headers = await register()
+    hits = auth.user_cache.hits
+    for _ in range(3):
+        assert (await api.get("/api/auth/me", headers=headers)).status_code == 200
+    assert auth.user_cache.hits == hits + 2
+
+    # Gone from the database, still served until the cache hears about it
+    await db.users.delete_one({"email": "traveller@example.com"})
+    assert (await api.get("/api/auth/me", headers=headers)).status_code == 200
+    auth.invalidate_user("traveller@example.com")
+    assert (await api.get("/api/auth/me", headers=headers)).status_code == 401
+
+@pytest.mark.anyio
+async def test_admin_flag_change_takes_effect_once_invalidated(api, db, register):
+    headers = await register()
+    assert (await api.get("/api/admin/stats", headers=headers)).status_code == 403
+    await db.users.update_one({"email": "traveller@example.com"}, {"$set": {"is_admin": True}})
+    auth.invalidate_user("traveller@example.com")
+    assert (await api.get("/api/admin/stats", headers=headers)).status_code == 200
+
+@pytest.mark.anyio
+async def test_cached_users_expire(api, db, register, monkeypatch):
+    monkeypatch.setattr(auth.user_cache, "ttl", 0)
+    headers = await register()
+    await api.get("/api/auth/me", headers=headers)
+    await db.users.delete_one({"email": "traveller@example.com"})
+    assert (await api.get("/api/auth/me", headers=headers)).status_code == 401
+
+@pytest.mark.anyio
+async def test_user_cache_counters_are_exposed(api, admin_headers):
+    await api.get("/api/auth/me", headers=admin_headers)
+    stats = (await api.get("/api/admin/cache/stats", headers=admin_headers)).json()["users"]
+    assert stats["hits"] == auth.user_cache.hits and stats["misses"] == auth.user_cache.misses
+    assert stats["size"] >= 1
+
+
+# ============ ADMISSION CONTROL ============
+
+@pytest.fixture
+def tight_limits(monkeypatch):
+    # conftest raises every burst; a few requests reach these
+    for name, rate, burst in (("login_ip", 60, 5), ("login_email", 6, 2), ("register_ip", 6, 2), ("register_email", 3, 1)):
+        monkeypatch.setitem(server.auth_limiters, name, TokenBucketLimiter(rate_per_minute=rate, burst=burst))
+
+async def login(api, email: str, password: str = "wrong-password"):
+    return await api.post("/api/auth/login", data={"username": email, "password": password})
+
+@pytest.mark.anyio
+async def test_login_is_rejected_before_hashing(api, register, tight_limits):
+    await register("reader@example.com")
+    assert (await login(api, "reader@example.com")).status_code == 401
+    assert (await login(api, "Reader@example.com")).status_code == 401
+
+    hashed = auth.hash_stats["completed"]
+    response = await login(api, "reader@example.com", "secret-password")
+    assert response.status_code == 429
+    # 6 per minute: the next token is 10 s away
+    assert response.headers["Retry-After"] == "10"
+    assert auth.hash_stats["completed"] == hashed
+
+    # Other accounts aren't locked out by someone else's attempts
+    assert (await login(api, "other@example.com")).status_code == 401
+
+@pytest.mark.anyio
+async def test_login_is_limited_per_ip(api, tight_limits):
+    statuses = [(await login(api, f"user{n}@example.com")).status_code for n in range(7)]
+    assert statuses == [401] * 5 + [429] * 2
+
+@pytest.mark.anyio
+async def test_register_is_limited_per_ip_without_creating_users(api, db, tight_limits):
+    statuses = []
+    for n in range(3):
+        response = await api.post("/api/auth/register", json={
+            "email": f"new{n}@example.com", "name": "New", "phone": "9876543210", "password": "secret-password"
+        })
+        statuses.append(response.status_code)
+    assert statuses == [200, 200, 429]
+    assert await db.users.count_documents({}) == 2
+
+@pytest.mark.anyio
+async def test_limiter_counters_are_exposed(api, admin_headers, tight_limits):
+    for _ in range(3):
+        await login(api, "reader@example.com")
+    limits = (await api.get("/api/admin/auth/stats", headers=admin_headers)).json()["rate_limits"]
+    assert (limits["login_email"]["allowed"], limits["login_email"]["rejected"]) == (2, 1)
+    assert limits["login_email"]["burst"] == 2
+
+def test_buckets_refill_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=2)
+    assert [limiter.acquire("ip") for _ in range(3)] == [0, 0, 1.0]
+    now[0] += 0.5
+    assert limiter.acquire("ip") == pytest.approx(0.5)
+    now[0] += 10
+    # Never more than the burst, however long the key was idle
+    assert [limiter.acquire("ip") for _ in range(3)] == [0, 0, pytest.approx(1.0)]
@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+
+import pytest
+
+from availability import DEFAULT_SLOT_TEMPLATES, roll_availability
+from tests.conftest import day, experience_payload
+
+pytestmark = pytest.mark.anyio
+
+TODAY = date(2030, 1, 1)
+
+
+def days_from(start: date, count: int) -> list:
+    return [(start + timedelta(days=i)).isoformat() for i in range(count)]
+
+async def published_dates(db, experience_id: int) -> list:
+    return sorted(set(await db.slots.distinct("date", {"experience_id": experience_id})))
+
+@pytest.fixture
+async def experience_id(api, admin_headers):
+    response = await api.post("/api/experiences", headers=admin_headers, json=experience_payload())
+    return response.json()["id"]
+
+
+# ============ NIGHTLY ROLL ============
+
+async def test_roll_publishes_the_window_from_templates(db, experience_id):
+    result = await roll_availability(db, horizon_days=5, today=TODAY)
+    assert result == {"experiences": 1, "inserted": 5 * len(DEFAULT_SLOT_TEMPLATES), "pruned": 0}
+    assert await published_dates(db, experience_id) == days_from(TODAY, 5)
+
+async def test_roll_twice_is_a_no_op(db, experience_id):
+    await roll_availability(db, horizon_days=5, today=TODAY)
+    before = await db.slots.find({}, {"_id": 0}).to_list(None)
+    result = await roll_availability(db, horizon_days=5, today=TODAY)
+    assert (result["inserted"], result["pruned"]) == (0, 0)
+    assert await db.slots.find({}, {"_id": 0}).to_list(None) == before
+
+async def test_roll_keeps_booked_seats(db, experience_id):
+    await roll_availability(db, horizon_days=5, today=TODAY)
+    key = {"experience_id": experience_id, "date": days_from(TODAY, 2)[1], "time": "10:00", "bookingType": "shared"}
+    await db.slots.update_one(key, {"$set": {"currentBookings": 3, "available": False}})
+
+    await roll_availability(db, horizon_days=5, today=TODAY)
+    await roll_availability(db, horizon_days=5, today=TODAY + timedelta(days=1))
+    slot = await db.slots.find_one(key)
+    assert (slot["currentBookings"], slot["available"]) == (3, False)
+
+async def test_next_night_adds_one_day_and_prunes_one(db, experience_id):
+    await roll_availability(db, horizon_days=5, today=TODAY)
+    result = await roll_availability(db, horizon_days=5, today=TODAY + timedelta(days=1))
+    assert result["inserted"] == result["pruned"] == len(DEFAULT_SLOT_TEMPLATES)
+    assert await published_dates(db, experience_id) == days_from(TODAY + timedelta(days=1), 5)
+
+async def test_closed_day_stays_closed(api, db, admin_headers, experience_id):
+    await roll_availability(db, horizon_days=5, today=TODAY)
+    availability = (await api.get(f"/api/experiences/{experience_id}")).json()["availability"]
+    closed = availability.pop(2)["date"]
+    # Leaving a day out of the full list is how an admin closes it
+    response = await api.put(f"/api/experiences/{experience_id}", headers=admin_headers, json={"availability": availability})
+    assert response.status_code == 200, response.text
+
+    await roll_availability(db, horizon_days=5, today=TODAY)
+    await roll_availability(db, horizon_days=5, today=TODAY + timedelta(days=1))
+    dates = await published_dates(db, experience_id)
+    assert closed not in dates
+    assert dates == [day for day in days_from(TODAY + timedelta(days=1), 5) if day != closed]
+
+async def test_first_roll_treats_gaps_before_the_last_slot_as_closed(db, experience_id):
+    # Published by hand before the roller ever ran, with the second day closed
+    first, _, third = days_from(TODAY, 3)
+    await db.slots.insert_many([
+        {"experience_id": experience_id, "date": day, "time": "10:00", "bookingType": "shared",
+         "maxCapacity": 5, "currentBookings": 0, "available": True}
+        for day in (first, third)
+    ])
+    await roll_availability(db, horizon_days=5, today=TODAY)
+    assert await published_dates(db, experience_id) == [first, third, *days_from(TODAY, 5)[3:]]
+
+
+# ============ CALENDAR ============
+
+@pytest.fixture
+async def calendar_experience(api, db, admin_headers, register):
+    response = await api.post("/api/experiences", headers=admin_headers, json=experience_payload(availability=[
+        day("2030-01-01", ("10:00", "shared", 2), ("14:00", "private", 2)),
+        day("2030-01-02", ("10:00", "shared", 1)),
+        day("2030-01-04", ("14:00", "private", 2)),
+    ]))
+    experience_id = response.json()["id"]
+    booking = await api.post("/api/bookings", headers=await register(), json={
+        "experience_id": experience_id, "experience_title": "x", "booking_type": "shared",
+        "date": "2030-01-02", "time": "10:00", "guests": {"adults": 1, "kids": 0}, "add_ons": {"souvenirKits": 0},
+        "customer_name": "x", "customer_email": "traveller@example.com", "customer_phone": "1", "total_price": 2500,
+    })
+    assert booking.status_code == 200, booking.text
+    # Closed by hand: published, but nothing can be booked
+    await db.slots.update_one({"experience_id": experience_id, "date": "2030-01-04"}, {"$set": {"available": False}})
+    return experience_id
+
+async def test_calendar_lists_remaining_seats_per_slot(api, calendar_experience):
+    response = await api.get(f"/api/experiences/{calendar_experience}/availability", params={"from": "2030-01-01", "to": "2030-01-05"})
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "experience_id": calendar_experience,
+        "from": "2030-01-01",
+        "to": "2030-01-05",
+        "slots": [{"time": "10:00", "bookingType": "shared"}, {"time": "14:00", "bookingType": "private"}],
+        "days": [
+            {"date": "2030-01-01", "remaining": [2, 2]},
+            {"date": "2030-01-02", "remaining": [0, None]},
+            {"date": "2030-01-04", "remaining": [None, 0]},
+        ],
+        "open": "10000",
+    }
+
+async def test_calendar_filters_by_type_and_range(api, calendar_experience):
+    response = await api.get(f"/api/experiences/{calendar_experience}/availability", params={
+        "from": "2030-01-02", "to": "2030-01-04", "type": "private"
+    })
+    calendar = response.json()
+    assert calendar["slots"] == [{"time": "14:00", "bookingType": "private"}]
+    assert calendar["days"] == [{"date": "2030-01-04", "remaining": [0]}]
+    assert calendar["open"] == "000"
+
+@pytest.mark.parametrize("params, status_code", [
+    ({"from": "2030-01-05", "to": "2030-01-01"}, 400),
+    ({"from": "01/01/2030"}, 400),
+    ({"from": "2030-01-01", "to": "2031-01-02"}, 400),
+    ({"from": "2030-01-01", "to": "2031-01-01"}, 200),
+])
+async def test_calendar_range_checks(api, calendar_experience, params, status_code):
+    response = await api.get(f"/api/experiences/{calendar_experience}/availability", params=params)
+    assert response.status_code == status_code
+
+async def test_calendar_for_unknown_experience(api):
+    assert (await api.get("/api/experiences/999/availability")).status_code == 404
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from tests.conftest import day, experience_payload
+
+pytestmark = pytest.mark.anyio
+
+DATE = "2030-01-01"
+OTHER_DATE = "2030-01-02"
+
+
+@pytest.fixture
+async def experience_id(api, admin_headers):
+    # Two seats on each day, free add-on menu so totals are just the base price
+    response = await api.post("/api/experiences", headers=admin_headers, json=experience_payload(
+        availability=[day(DATE, ("10:00", "shared", 2)), day(OTHER_DATE, ("10:00", "shared", 2))]
+    ))
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+def booking(experience_id: int, date: str = DATE, email: str = "traveller@example.com") -> dict:
+    return {
+        "experience_id": experience_id,
+        "experience_title": "Kondapalli Toy Makers Trail",
+        "booking_type": "shared",
+        "date": date,
+        "time": "10:00",
+        "guests": {"adults": 1, "kids": 0},
+        "add_ons": {"souvenirKits": 0},
+        "customer_name": "Traveller",
+        "customer_email": email,
+        "customer_phone": "9876543210",
+        "total_price": 2500,
+    }
+
+async def seats(db, experience_id: int) -> dict:
+    return {
+        slot["date"]: slot["currentBookings"]
+        async for slot in db.slots.find({"experience_id": experience_id})
+    }
+
+
+async def test_booking_takes_a_seat(api, db, register, experience_id):
+    headers = await register()
+    response = await api.post("/api/bookings", json=booking(experience_id), headers=headers)
+    assert response.status_code == 200, response.text
+    assert await seats(db, experience_id) == {DATE: 1, OTHER_DATE: 0}
+
+async def test_full_slot_rejects_booking(api, db, register, experience_id):
+    headers = await register()
+    for _ in range(2):
+        assert (await api.post("/api/bookings", json=booking(experience_id), headers=headers)).status_code == 200
+    response = await api.post("/api/bookings", json=booking(experience_id), headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "This time slot is fully booked"
+    assert await seats(db, experience_id) == {DATE: 2, OTHER_DATE: 0}
+
+async def test_concurrent_bookings_never_oversell(api, db, register, experience_id):
+    headers = await register()
+    responses = await asyncio.gather(*[
+        api.post("/api/bookings", json=booking(experience_id), headers=headers) for _ in range(6)
+    ])
+    assert sorted(response.status_code for response in responses) == [200, 200, 400, 400, 400, 400]
+    assert (await seats(db, experience_id))[DATE] == 2
+    assert await db.bookings.count_documents({}) == 2
+
+async def test_cancel_releases_the_seat_once(api, db, register, experience_id):
+    headers = await register()
+    booking_id = (await api.post("/api/bookings", json=booking(experience_id), headers=headers)).json()["id"]
+    other = await register("other@example.com")
+    await api.post("/api/bookings", json=booking(experience_id, email="other@example.com"), headers=other)
+
+    assert (await api.delete(f"/api/bookings/{booking_id}", headers=headers)).status_code == 200
+    # Repeated cancels succeed but must not free the other customer's seat
+    assert (await api.delete(f"/api/bookings/{booking_id}", headers=headers)).status_code == 200
+    assert (await seats(db, experience_id))[DATE] == 1
+
+async def test_cancelled_booking_cannot_be_reinstated(api, db, register, experience_id):
+    headers = await register()
+    booking_id = (await api.post("/api/bookings", json=booking(experience_id), headers=headers)).json()["id"]
+    await api.delete(f"/api/bookings/{booking_id}", headers=headers)
+
+    response = await api.put(f"/api/bookings/{booking_id}", json={"status": "confirmed"}, headers=headers)
+    assert response.status_code == 400
+    # The cancel → reinstate → cancel sequence used to release a second seat
+    await api.delete(f"/api/bookings/{booking_id}", headers=headers)
+    assert (await seats(db, experience_id))[DATE] == 0
+    assert (await db.bookings.find_one({"id": booking_id}))["status"] == "cancelled"
+
+async def test_reschedule_moves_the_seat(api, db, register, experience_id):
+    headers = await register()
+    booking_id = (await api.post("/api/bookings", json=booking(experience_id), headers=headers)).json()["id"]
+
+    response = await api.put(f"/api/bookings/{booking_id}", json={"date": OTHER_DATE}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["date"] == OTHER_DATE
+    assert await seats(db, experience_id) == {DATE: 0, OTHER_DATE: 1}
+
+async def test_reschedule_into_full_slot_keeps_the_old_seat(api, db, register, experience_id):
+    headers = await register()
+    booking_id = (await api.post("/api/bookings", json=booking(experience_id), headers=headers)).json()["id"]
+    for _ in range(2):
+        await api.post("/api/bookings", json=booking(experience_id, OTHER_DATE), headers=headers)
+
+    response = await api.put(f"/api/bookings/{booking_id}", json={"date": OTHER_DATE}, headers=headers)
+    assert response.status_code == 400
+    assert await seats(db, experience_id) == {DATE: 1, OTHER_DATE: 2}
+    assert (await db.bookings.find_one({"id": booking_id}))["date"] == DATE
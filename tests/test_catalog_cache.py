@@ -0,0 +1,64 @@
+import pytest
+
+from tests.conftest import day, experience_payload
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def experience_id(api, admin_headers):
+    response = await api.post("/api/experiences", headers=admin_headers, json=experience_payload(
+        availability=[day("2030-01-01", ("10:00", "shared", 2))]
+    ))
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize("url", ["/api/experiences", "/api/experiences?view=summary", "/api/experiences/{id}"])
+async def test_matching_etag_gets_304(api, experience_id, url):
+    url = url.format(id=experience_id)
+    first = await api.get(url)
+    etag = first.headers["ETag"]
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = await api.get(url, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+    assert (await api.get(url, headers={"If-None-Match": '"other"'})).status_code == 200
+
+async def test_repeat_reads_are_served_from_the_cache(api, db, experience_id):
+    before = (await api.get(f"/api/experiences/{experience_id}")).json()
+    # Not through the admin routes, so nothing invalidates the cache
+    await db.experiences.update_one({"id": experience_id}, {"$set": {"title": "Changed behind the cache"}})
+    assert (await api.get(f"/api/experiences/{experience_id}")).json() == before
+
+async def test_admin_edit_invalidates_list_and_detail(api, admin_headers, experience_id):
+    list_etag = (await api.get("/api/experiences")).headers["ETag"]
+    detail_etag = (await api.get(f"/api/experiences/{experience_id}")).headers["ETag"]
+
+    await api.put(f"/api/experiences/{experience_id}", headers=admin_headers, json={"title": "Renamed Trail"})
+
+    listing = await api.get("/api/experiences", headers={"If-None-Match": list_etag})
+    assert listing.status_code == 200
+    assert listing.json()[0]["title"] == "Renamed Trail"
+    detail = await api.get(f"/api/experiences/{experience_id}", headers={"If-None-Match": detail_etag})
+    assert detail.status_code == 200
+    assert detail.json()["title"] == "Renamed Trail"
+
+async def test_admin_delete_invalidates(api, admin_headers, experience_id):
+    await api.get("/api/experiences")
+    await api.delete(f"/api/experiences/{experience_id}", headers=admin_headers)
+    assert (await api.get("/api/experiences")).json() == []
+    assert (await api.get(f"/api/experiences/{experience_id}")).status_code == 404
+
+async def test_booking_refreshes_the_cached_seat_count(api, register, experience_id):
+    etag = (await api.get(f"/api/experiences/{experience_id}")).headers["ETag"]
+    response = await api.post("/api/bookings", headers=await register(), json={
+        "experience_id": experience_id, "experience_title": "x", "booking_type": "shared",
+        "date": "2030-01-01", "time": "10:00", "guests": {"adults": 1, "kids": 0}, "add_ons": {"souvenirKits": 0},
+        "customer_name": "x", "customer_email": "traveller@example.com", "customer_phone": "1", "total_price": 2500,
+    })
+    assert response.status_code == 200, response.text
+
+    detail = await api.get(f"/api/experiences/{experience_id}", headers={"If-None-Match": etag})
+    assert detail.status_code == 200
+    assert detail.json()["availability"][0]["timeSlots"][0]["currentBookings"] == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from tests.conftest import day, experience_payload
+
+pytestmark = pytest.mark.anyio
+
+
+async def slot_keys(db, experience_id: int) -> list:
+    return sorted([
+        (slot["date"], slot["time"], slot["bookingType"])
+        async for slot in db.slots.find({"experience_id": experience_id})
+    ])
+
+
+async def test_bulk_create_merges_repeated_dates(api, db, admin_headers):
+    # The same date listed twice used to hit the unique slot index and 500
+    repeated = experience_payload(availability=[
+        day("2030-01-01", ("10:00", "shared", 5)),
+        day("2030-01-01", ("10:00", "shared", 8), ("14:00", "private", 2)),
+    ])
+    response = await api.post("/api/experiences/bulk", headers=admin_headers, json=[repeated, experience_payload()])
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["inserted_count"], result["errors"]) == (2, [])
+
+    experience_id = result["ids"][0]
+    assert await slot_keys(db, experience_id) == [("2030-01-01", "10:00", "shared"), ("2030-01-01", "14:00", "private")]
+    # Last listing wins
+    slot = await db.slots.find_one({"experience_id": experience_id, "time": "10:00"})
+    assert slot["maxCapacity"] == 8
+
+
+@pytest.fixture
+async def experience_id(api, admin_headers):
+    response = await api.post("/api/experiences", headers=admin_headers, json=experience_payload(availability=[
+        day("2030-01-01", ("10:00", "shared", 2)),
+        day("2030-01-02", ("10:00", "shared", 2), ("14:00", "shared", 2)),
+    ]))
+    return response.json()["id"]
+
+async def test_update_replaces_the_whole_availability(api, db, admin_headers, experience_id):
+    response = await api.put(f"/api/experiences/{experience_id}", headers=admin_headers, json={
+        "availability": [day("2030-01-02", ("10:00", "shared", 4)), day("2030-01-03", ("09:00", "shared", 2))]
+    })
+    assert response.status_code == 200, response.text
+    assert [entry["date"] for entry in response.json()["availability"]] == ["2030-01-02", "2030-01-03"]
+    assert await slot_keys(db, experience_id) == [("2030-01-02", "10:00", "shared"), ("2030-01-03", "09:00", "shared")]
+
+async def test_update_without_availability_keeps_slots(api, db, admin_headers, experience_id):
+    before = await slot_keys(db, experience_id)
+    response = await api.put(f"/api/experiences/{experience_id}", headers=admin_headers, json={"title": "Renamed"})
+    assert response.status_code == 200, response.text
+    assert await slot_keys(db, experience_id) == before
+
+async def test_update_cannot_drop_a_booked_slot(api, db, admin_headers, experience_id):
+    await db.slots.update_one({"experience_id": experience_id, "date": "2030-01-01"}, {"$set": {"currentBookings": 1}})
+    before = await slot_keys(db, experience_id)
+
+    response = await api.put(f"/api/experiences/{experience_id}", headers=admin_headers, json={
+        "availability": [day("2030-01-02", ("10:00", "shared", 2))]
+    })
+    assert response.status_code == 400
+    assert "2030-01-01 10:00 shared" in response.json()["detail"]
+    assert await slot_keys(db, experience_id) == before
+
@@ -0,0 +1,66 @@
+import pytest
+
+from tests.conftest import experience_payload
+
+pytestmark = pytest.mark.anyio
+
+
+def stored_experience(experience_id: int, category: str, location: str, price: int, booking_types=None) -> dict:
+    experience = {**experience_payload(category=category, location=location, price=price), "id": experience_id, "rating": 4.5}
+    if booking_types is not None:
+        experience["bookingTypes"] = booking_types
+    return experience
+
+@pytest.fixture
+async def catalog(db):
+    await db.experiences.insert_many([
+        stored_experience(1, "Heritage", "Amaravati", 1200, ["private", "shared"]),
+        # No bookingTypes counts as all three, like the Experience model
+        stored_experience(2, "Heritage", "Guntur", 2500),
+        stored_experience(3, "Culinary", "Guntur", 3499, ["group"]),
+        stored_experience(4, "Spiritual", "Amaravati", 7000, ["shared"]),
+    ])
+
+def counts(facet: list) -> list:
+    return [(entry["value"], entry["count"]) for entry in facet]
+
+def bucket_counts(facets: dict) -> list:
+    return [(bucket["min"], bucket["max"], bucket["count"]) for bucket in facets["price"]]
+
+
+async def test_facets_over_the_whole_catalog(api, catalog):
+    response = await api.get("/api/experiences/facets")
+    assert response.status_code == 200, response.text
+    facets = response.json()
+    assert facets["total"] == 4
+    # Most common first, ties by name
+    assert counts(facets["category"]) == [("Heritage", 2), ("Culinary", 1), ("Spiritual", 1)]
+    assert counts(facets["location"]) == [("Amaravati", 2), ("Guntur", 2)]
+    assert counts(facets["bookingTypes"]) == [("shared", 3), ("group", 2), ("private", 2)]
+    assert bucket_counts(facets) == [(0, 1500, 1), (1500, 2500, 0), (2500, 3500, 2), (3500, 5000, 0), (5000, None, 1)]
+    assert (facets["minPrice"], facets["maxPrice"]) == (1200, 7000)
+
+async def test_facets_follow_the_filters(api, catalog):
+    facets = (await api.get("/api/experiences/facets", params={"location": "Guntur", "max_price": 3000})).json()
+    assert facets["total"] == 1
+    assert counts(facets["category"]) == [("Heritage", 1)]
+    assert counts(facets["bookingTypes"]) == [("group", 1), ("private", 1), ("shared", 1)]
+    assert bucket_counts(facets)[2] == (2500, 3500, 1)
+    assert (facets["minPrice"], facets["maxPrice"]) == (2500, 2500)
+
+async def test_facets_when_nothing_matches(api, catalog):
+    facets = (await api.get("/api/experiences/facets", params={"category": "Nature"})).json()
+    assert facets["total"] == 0
+    assert facets["category"] == facets["location"] == facets["bookingTypes"] == []
+    assert all(count == 0 for _, _, count in bucket_counts(facets))
+    assert (facets["minPrice"], facets["maxPrice"]) == (None, None)
+
+async def test_facets_are_cached_per_filter_set(api, db, admin_headers, catalog):
+    heritage = (await api.get("/api/experiences/facets", params={"category": "Heritage"})).json()
+    await db.experiences.insert_one(stored_experience(5, "Heritage", "Guntur", 900))
+    assert (await api.get("/api/experiences/facets", params={"category": "Heritage"})).json() == heritage
+    # A different filter set is its own entry
+    assert (await api.get("/api/experiences/facets")).json()["total"] == 5
+
+    await api.put("/api/experiences/3", headers=admin_headers, json={"category": "Heritage"})
+    assert (await api.get("/api/experiences/facets", params={"category": "Heritage"})).json()["total"] == 4
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def subscribe(api, email: str = "reader@example.com"):
+    return await api.post("/api/newsletter/subscribe", json={"email": email})
+
+
+async def test_subscribe_creates_an_active_subscriber(api, db):
+    response = await subscribe(api)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "active"
+    assert await db.newsletter_subscribers.count_documents({"email": "reader@example.com"}) == 1
+
+async def test_active_subscriber_cannot_subscribe_twice(api, db):
+    await subscribe(api)
+    response = await subscribe(api)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already subscribed"
+    assert await db.newsletter_subscribers.count_documents({}) == 1
+
+async def test_unsubscribed_reader_is_reactivated_in_place(api, db):
+    first = (await subscribe(api)).json()
+    await db.newsletter_subscribers.update_one({"email": "reader@example.com"}, {"$set": {"status": "unsubscribed"}})
+
+    response = await subscribe(api)
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == first["id"]
+    assert response.json()["status"] == "active"
+    assert await db.newsletter_subscribers.count_documents({}) == 1
+
+async def test_concurrent_subscribes_store_one_subscriber(api, db):
+    responses = await asyncio.gather(*[subscribe(api) for _ in range(5)])
+    assert sorted(response.status_code for response in responses) == [200, 400, 400, 400, 400]
+    assert await db.newsletter_subscribers.count_documents({}) == 1
+
+
+# ============ IMPORT ============
+
+async def upload(api, admin_headers, content: bytes):
+    return await api.post(
+        "/api/admin/newsletter/import", headers=admin_headers,
+        files={"file": ("subscribers.csv", content, "text/csv")},
+    )
+
+async def test_import_adds_new_emails_only(api, db, admin_headers):
+    await subscribe(api, "existing@example.com")
+    response = await upload(api, admin_headers, b"Email\nnew@example.com\nexisting@example.com\nnot-an-email\nnew@example.com\n")
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["processed"], result["inserted"], result["existing"], result["invalid"]) == (4, 1, 2, 1)
+    assert result["errors"] == [{"row": 4, "email": "not-an-email", "message": "Invalid email"}]
+    assert await db.newsletter_subscribers.count_documents({}) == 2
+
+async def test_import_keeps_unsubscribed_readers_unsubscribed(api, db, admin_headers):
+    await subscribe(api)
+    await db.newsletter_subscribers.update_one({"email": "reader@example.com"}, {"$set": {"status": "unsubscribed"}})
+    await upload(api, admin_headers, b"email\nreader@example.com\n")
+    assert (await db.newsletter_subscribers.find_one({"email": "reader@example.com"}))["status"] == "unsubscribed"
+
+@pytest.mark.parametrize("content", [
+    "email\nrené@example.com\n".encode("latin-1"),
+    "émail\nreader@example.com\n".encode("latin-1"),
+])
+async def test_import_rejects_files_that_are_not_utf8(api, admin_headers, content):
+    response = await upload(api, admin_headers, content)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("File must be a UTF-8 encoded CSV")
+
+async def test_import_needs_an_email_column(api, admin_headers):
+    response = await upload(api, admin_headers, b"name\nReader\n")
+    assert response.status_code == 400
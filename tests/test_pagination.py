@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor
+from tests.conftest import experience_payload
+
+pytestmark = pytest.mark.anyio
+
+
+async def pages(api, url: str, **kwargs):
+    """Follow X-Next-Cursor to the end; returns the pages' ids."""
+    params = dict(kwargs.pop("params", {}))
+    result = []
+    while True:
+        response = await api.get(url, params=params, **kwargs)
+        assert response.status_code == 200, response.text
+        result.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return result
+        params["cursor"] = cursor
+
+
+def test_cursor_round_trip():
+    position = {"created_at": "2030-01-01T00:00:00", "id": "BD0001"}
+    assert decode_cursor(encode_cursor(position)) == position
+
+
+def stored_experience(experience_id: int, **overrides) -> dict:
+    return {**experience_payload(**overrides), "id": experience_id, "rating": 4.5}
+
+async def test_experience_pages_cover_everything_once(api, db):
+    # Inserted out of order; pages follow id order
+    await db.experiences.insert_many([stored_experience(i, title=f"Trail {i}") for i in (5, 1, 4, 2, 3, 7, 6)])
+    assert await pages(api, "/api/experiences", params={"view": "summary", "limit": 3}) == [[1, 2, 3], [4, 5, 6], [7]]
+
+async def test_experience_pages_respect_filters(api, db):
+    await db.experiences.insert_many([
+        stored_experience(i, category="Culinary" if i % 2 else "Heritage") for i in range(1, 8)
+    ])
+    result = await pages(api, "/api/experiences", params={"view": "summary", "limit": 2, "category": "Culinary"})
+    assert result == [[1, 3], [5, 7]]
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    encode_cursor({}),
+    encode_cursor({"id": "3"}),
+    encode_cursor({"id": True}),
+    encode_cursor(["id", 3]),
+])
+async def test_malformed_experience_cursor_is_rejected(api, db, cursor):
+    await db.experiences.insert_one(stored_experience(1))
+    response = await api.get("/api/experiences", params={"view": "summary", "limit": 2, "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def booking_document(booking_id: str, created_at: datetime, status: str = "confirmed") -> dict:
+    return {
+        "id": booking_id, "user_id": "user", "experience_id": 1, "experience_title": "x",
+        "booking_type": "shared", "date": "2030-01-01", "time": "10:00",
+        "guests": {"adults": 1, "kids": 0}, "group_size": None, "add_ons": {},
+        "customer_name": "x", "customer_email": "x@example.com", "customer_phone": "1",
+        "total_price": 2500, "status": status, "created_at": created_at, "updated_at": created_at,
+    }
+
+async def test_booking_pages_are_newest_first_with_ties_broken_by_id(api, db, admin_headers):
+    start = datetime(2030, 1, 1)
+    # BD02-BD04 share a timestamp, so only the id keeps the order total
+    created = {"BD01": start, "BD02": start + timedelta(hours=1), "BD03": start + timedelta(hours=1),
+               "BD04": start + timedelta(hours=1), "BD05": start + timedelta(hours=2)}
+    await db.bookings.insert_many([booking_document(booking_id, at) for booking_id, at in created.items()])
+
+    result = await pages(api, "/api/admin/bookings", params={"limit": 2}, headers=admin_headers)
+    assert result == [["BD05", "BD04"], ["BD03", "BD02"], ["BD01"]]
+
+async def test_booking_pages_respect_status_filter(api, db, admin_headers):
+    start = datetime(2030, 1, 1)
+    await db.bookings.insert_many([
+        booking_document(f"BD0{i}", start + timedelta(hours=i), "cancelled" if i % 2 else "confirmed")
+        for i in range(1, 7)
+    ])
+    result = await pages(api, "/api/admin/bookings", params={"limit": 2, "status": "confirmed"}, headers=admin_headers)
+    assert result == [["BD06", "BD04"], ["BD02"]]
+
+@pytest.mark.parametrize("cursor", ["%%%", encode_cursor({"id": "BD01"}), encode_cursor({"created_at": "yesterday", "id": "BD01"})])
+async def test_malformed_booking_cursor_is_rejected(api, admin_headers, cursor):
+    response = await api.get("/api/admin/bookings", params={"cursor": cursor}, headers=admin_headers)
+    assert response.status_code == 400
@@ -0,0 +1,208 @@
+import itertools
+import math
+
+import pytest
+
+from models import AddOn, AddOns, BookingCreate, PricingStructure, QuoteRequest
+from pricing import DEFAULT_ADD_ONS, expand_quote_grid, price_grid, quote_booking, quote_grid_size
+from tests.conftest import day, experience_payload
+
+
+def calculate_price(pricing: dict, add_ons: list, booking_type: str, adults: int, kids: int, group_size: int, selected: dict) -> dict:
+    """Line-by-line port of calculatePrice() in frontend/src/pages/ExperienceDetail.jsx."""
+    base_price = 0
+    if booking_type == "private" and (pricing.get("private") or {}).get("enabled"):
+        private = pricing["private"]
+        base_price = private["firstAdult"] + (adults - 1) * private["additionalAdult"] + kids * private["child"]
+    elif booking_type == "shared" and (pricing.get("shared") or {}).get("enabled"):
+        base_price = adults * pricing["shared"]["adult"] + kids * pricing["shared"]["child"]
+    elif booking_type == "group" and (pricing.get("group") or {}).get("enabled"):
+        group = pricing["group"]
+        tier = group["tier1"] if group_size <= group["tier1"]["max"] else group["tier2"]
+        base_price = group_size * tier["pricePerPerson"]
+
+    add_ons_cost = 0
+    guest_count = adults + kids
+    for addon in add_ons:
+        if not addon["active"]:
+            continue
+        if "Pickup" in addon["name"] and selected["pickup"] and selected["pickupLocation"]:
+            matches_location = (
+                ("Vijayawada" in addon["name"] and selected["pickupLocation"] == "vijayawada")
+                or ("Guntur" in addon["name"] and selected["pickupLocation"] == "guntur")
+            )
+            if matches_location and addon["calculationType"] == "per_3_guests":
+                add_ons_cost += math.ceil(guest_count / 3) * addon["price"]
+        elif "Special Puja" in addon["name"]:
+            if addon["calculationType"] == "per_person":
+                add_ons_cost += selected["specialPuja"] * addon["price"]
+        elif "Souvenir" in addon["name"]:
+            if addon["calculationType"] == "per_adult":
+                add_ons_cost += selected["souvenirKits"] * addon["price"]
+        elif "Photography" in addon["name"] and selected["photography"]:
+            if addon["calculationType"] == "flat":
+                add_ons_cost += addon["price"]
+    return {"basePrice": base_price, "addOnsCost": add_ons_cost, "total": base_price + add_ons_cost}
+
+
+SELECTIONS = [
+    AddOns(souvenirKits=0),
+    AddOns(),
+    AddOns(pickup=True, pickupLocation="vijayawada", specialPuja=2, souvenirKits=3),
+    AddOns(pickup=True, pickupLocation="guntur", photography=True),
+    # Location chosen but pickup unticked: the widget charges nothing
+    AddOns(pickup=False, pickupLocation="guntur", souvenirKits=0),
+]
+CUSTOM_PRICING = PricingStructure(
+    private={"enabled": False, "firstAdult": 9000, "additionalAdult": 100, "child": 100},
+    shared={"enabled": True, "adult": 1999, "child": 0},
+    group={
+        "enabled": True,
+        "tier1": {"min": 5, "max": 12, "pricePerPerson": 1800},
+        "tier2": {"min": 13, "max": 40, "pricePerPerson": 1500},
+    },
+)
+CUSTOM_ADD_ONS = [
+    {**DEFAULT_ADD_ONS[0], "active": False},
+    {**DEFAULT_ADD_ONS[1], "price": 999},
+    # Wrong calculation type: ignored by both sides
+    {**DEFAULT_ADD_ONS[2], "calculationType": "flat"},
+    DEFAULT_ADD_ONS[3],
+]
+
+
+@pytest.mark.parametrize("pricing, add_ons", [
+    (PricingStructure(), DEFAULT_ADD_ONS),
+    (CUSTOM_PRICING, CUSTOM_ADD_ONS),
+    (PricingStructure(), []),
+])
+def test_price_grid_matches_frontend(pricing, add_ons):
+    grid = [
+        (booking_type, adults, kids, group_size if booking_type == "group" else None, selected)
+        for booking_type, adults, kids, group_size, selected in itertools.product(
+            ["private", "shared", "group"], [1, 2, 4, 7], [0, 1, 3], [5, 10, 17, 18, 25], SELECTIONS
+        )
+    ]
+    base, extras = price_grid(pricing, [AddOn(**addon) for addon in add_ons], grid)
+    for (booking_type, adults, kids, group_size, selected), base_price, extras_price in zip(grid, base, extras):
+        expected = calculate_price(
+            pricing.model_dump(), add_ons, booking_type, adults, kids, group_size or 10, selected.model_dump()
+        )
+        assert (int(base_price), int(extras_price)) == (expected["basePrice"], expected["addOnsCost"]), (
+            booking_type, adults, kids, group_size, selected
+        )
+
+def test_quote_booking_matches_frontend():
+    booking = BookingCreate(
+        experience_id=1, experience_title="x", booking_type="private", date="2030-01-01", time="09:00",
+        guests={"adults": 3, "kids": 2}, add_ons=SELECTIONS[2],
+        customer_name="x", customer_email="x@example.com", customer_phone="1", total_price=0,
+    )
+    expected = calculate_price(
+        PricingStructure().model_dump(), DEFAULT_ADD_ONS, "private", 3, 2, 10, SELECTIONS[2].model_dump()
+    )
+    assert quote_booking(PricingStructure(), [AddOn(**addon) for addon in DEFAULT_ADD_ONS], booking) == expected["total"]
+
+def test_quote_grid_size_matches_expansion():
+    request = QuoteRequest(adults=[1, 2, 3], kids=[0, 1], group_sizes=[10, 20], add_ons=[AddOns(), AddOns(souvenirKits=0)])
+    assert quote_grid_size(request) == len(expand_quote_grid(request)) == 3 * 2 * 2 * (1 + 1 + 2)
+
+
+# ============ API ============
+
+@pytest.fixture
+async def experience_id(api, admin_headers):
+    response = await api.post("/api/experiences", headers=admin_headers, json=experience_payload(
+        pricing=CUSTOM_PRICING.model_dump(),
+        addOns=DEFAULT_ADD_ONS,
+        availability=[day("2030-01-01", ("10:00", "shared", 5), ("11:00", "group", 5), ("09:00", "private", 5))],
+    ))
+    return response.json()["id"]
+
+def booking_body(experience_id: int, **overrides) -> dict:
+    body = {
+        "experience_id": experience_id, "experience_title": "x", "booking_type": "shared",
+        "date": "2030-01-01", "time": "10:00", "guests": {"adults": 2, "kids": 1},
+        "add_ons": {"souvenirKits": 0}, "customer_name": "x", "customer_email": "traveller@example.com",
+        "customer_phone": "1", "total_price": 2 * 1999,
+    }
+    body.update(overrides)
+    return body
+
+@pytest.mark.anyio
+async def test_booking_at_frontend_price_is_accepted(api, register, experience_id):
+    selected = {"pickup": True, "pickupLocation": "guntur", "specialPuja": 1, "souvenirKits": 2, "photography": True}
+    expected = calculate_price(CUSTOM_PRICING.model_dump(), DEFAULT_ADD_ONS, "group", 2, 1, 15, selected)
+    response = await api.post("/api/bookings", headers=await register(), json=booking_body(
+        experience_id, booking_type="group", time="11:00", group_size=15, add_ons=selected, total_price=expected["total"]
+    ))
+    assert response.status_code == 200, response.text
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("overrides, status_code", [
+    ({"total_price": 1}, 400),
+    # Priced at 0 by price_grid, so a 0 total used to be accepted
+    ({"booking_type": "group", "time": "11:00", "group_size": None, "total_price": 0}, 400),
+    ({"booking_type": "group", "time": "11:00", "group_size": 41, "total_price": 41 * 1500}, 400),
+    ({"booking_type": "private", "time": "09:00", "total_price": 0}, 400),
+    ({"booking_type": "helicopter", "total_price": 0}, 400),
+    ({"guests": {"adults": -5, "kids": -3}, "total_price": -17600}, 422),
+    ({"add_ons": {"souvenirKits": -2}, "total_price": 2 * 1999 + 1999 - 2000}, 422),
+])
+async def test_booking_price_cannot_be_bypassed(api, db, register, experience_id, overrides, status_code):
+    response = await api.post("/api/bookings", headers=await register(), json=booking_body(experience_id, **overrides))
+    assert response.status_code == status_code, response.text
+    assert await db.bookings.count_documents({}) == 0
+
+@pytest.mark.anyio
+async def test_booking_update_is_repriced(api, db, register, experience_id):
+    headers = await register()
+    booking_id = (await api.post("/api/bookings", headers=headers, json=booking_body(experience_id))).json()["id"]
+    selected = {"pickup": False, "pickupLocation": "", "photography": True, "specialPuja": 16, "souvenirKits": 12}
+    # Used to keep the 2-guest total whatever was added afterwards
+    response = await api.put(f"/api/bookings/{booking_id}", headers=headers, json={
+        "guests": {"adults": 12, "kids": 4}, "add_ons": selected
+    })
+    assert response.status_code == 200, response.text
+    expected = calculate_price(CUSTOM_PRICING.model_dump(), DEFAULT_ADD_ONS, "shared", 12, 4, 10, selected)
+    assert response.json()["total_price"] == expected["total"]
+    assert (await db.bookings.find_one({"id": booking_id}))["total_price"] == expected["total"]
+
+@pytest.mark.anyio
+async def test_booking_update_needs_a_bookable_type(api, db, admin_headers, register, experience_id):
+    headers = await register()
+    booking_id = (await api.post("/api/bookings", headers=headers, json=booking_body(experience_id))).json()["id"]
+    shared_off = {**CUSTOM_PRICING.model_dump(), "shared": {**CUSTOM_PRICING.shared, "enabled": False}}
+    await api.put(f"/api/experiences/{experience_id}", headers=admin_headers, json={"pricing": shared_off})
+
+    # price_grid prices a disabled type at 0
+    response = await api.put(f"/api/bookings/{booking_id}", headers=headers, json={"guests": {"adults": 6, "kids": 0}})
+    assert response.status_code == 400
+    assert (await db.bookings.find_one({"id": booking_id}))["total_price"] == 2 * 1999
+
+@pytest.mark.anyio
+async def test_quotes_match_frontend(api, experience_id):
+    response = await api.post(f"/api/experiences/{experience_id}/quotes", json={
+        "booking_types": ["shared", "group"], "adults": [1, 4], "kids": [0, 2], "group_sizes": [12, 30],
+        "add_ons": [{"pickup": True, "pickupLocation": "vijayawada", "souvenirKits": 1}],
+    })
+    assert response.status_code == 200, response.text
+    quotes = response.json()["quotes"]
+    assert len(quotes) == 4 + 8
+    for quote in quotes:
+        expected = calculate_price(
+            CUSTOM_PRICING.model_dump(), DEFAULT_ADD_ONS, quote["booking_type"], quote["adults"], quote["kids"],
+            quote["group_size"] or 10, quote["add_ons"]
+        )
+        assert quote["total_price"] == expected["total"]
+
+@pytest.mark.anyio
+async def test_oversized_quote_grid_is_rejected_up_front(api, experience_id):
+    response = await api.post(f"/api/experiences/{experience_id}/quotes", json={
+        "adults": list(range(1, 51)), "kids": list(range(50)), "add_ons": [{}, {"souvenirKits": 0}],
+    })
+    assert response.status_code == 400
+    response = await api.post(f"/api/experiences/{experience_id}/quotes", json={
+        "adults": list(range(1, 2001)), "kids": list(range(2000)),
+    })
+    assert response.status_code == 422
@@ -0,0 +1,112 @@
+import pytest
+
+import server
+from search import SearchIndex
+from tests.conftest import experience_payload
+
+pytestmark = pytest.mark.anyio
+
+
+async def search(api, q: str) -> list:
+    response = await api.get("/api/experiences/search", params={"q": q})
+    assert response.status_code == 200, response.text
+    return [(result["id"], result["title"]) for result in response.json()]
+
+
+CATALOG = [
+    {"title": "Kalamkari Painting Workshop", "category": "Handlooms & Handicrafts", "location": "Pedana",
+     "description": "Hand-paint cotton with natural dyes."},
+    {"title": "Amaravati Heritage Walk", "category": "Heritage", "location": "Amaravati",
+     "description": "Stupa ruins, then a kalamkari stall in the market."},
+    {"title": "Kondapalli Toy Makers Trail", "category": "Handlooms & Handicrafts", "location": "Kondapalli",
+     "description": "Watch toys carved from tella poniki wood."},
+    {"title": "Temple Tea Trail", "category": "Spiritual", "location": "Mangalagiri",
+     "description": "Temple visits with tea stops. Café break included."},
+]
+
+
+def build_index() -> SearchIndex:
+    index = SearchIndex()
+    for experience_id, fields in enumerate(CATALOG, start=1):
+        experience = {**experience_payload(**fields), "id": experience_id}
+        index.upsert(experience, {"id": experience_id, "title": experience["title"]})
+    return index
+
+def ids(results: list) -> list:
+    return [result["id"] for result in results]
+
+
+def test_title_matches_outrank_body_matches():
+    assert ids(build_index().search("kalamkari")) == [1, 2]
+
+def test_typos_are_tolerated_for_longer_words():
+    index = build_index()
+    assert ids(index.search("kalamkri"))[:1] == [1]
+    assert ids(index.search("amaravathi walk")) == [2]
+    # Exact spellings still rank first
+    assert index.search("kalamkri")[0]["score"] < index.search("kalamkari")[0]["score"]
+
+def test_short_words_need_exact_matches():
+    index = build_index()
+    assert ids(index.search("tea")) == [4]
+    assert index.search("tee") == []
+
+def test_last_word_is_completed():
+    index = build_index()
+    assert ids(index.search("toy kondap")) == [3]
+    # Only the last word is still being typed
+    assert ids(index.search("kondap walk")) == [2]
+
+def test_accents_case_and_stop_words_are_ignored():
+    index = build_index()
+    assert ids(index.search("CAFE")) == [4]
+    assert ids(index.search("café")) == [4]
+    assert index.search("the and of") == []
+
+def test_suggest_completes_titles_with_typos():
+    index = build_index()
+    assert index.suggest("kond") == [{"id": 3, "title": "Kondapalli Toy Makers Trail"}]
+    assert index.suggest("kondapali") == [{"id": 3, "title": "Kondapalli Toy Makers Trail"}]
+    # Earlier words only re-rank the completions of the last one
+    assert ids(index.suggest("temple tra")) == [4, 3]
+    assert ids(index.suggest("toy tra")) == [3, 4]
+    assert index.suggest("xyzzy") == []
+
+def test_index_follows_upserts_and_removals():
+    index = build_index()
+    index.upsert({**experience_payload(**CATALOG[2]), "id": 3, "title": "Bommala Kolupu Trail"},
+                 {"id": 3, "title": "Bommala Kolupu Trail"})
+    assert index.search("kondapalli toy makers")[0]["id"] == 3  # still in the description and location
+    assert index.suggest("toy") == []
+    assert ids(index.suggest("bomm")) == [3]
+    index.remove(3)
+    assert index.search("bommala") == []
+    assert len(index) == 3
+
+
+async def test_admin_routes_keep_search_current(api, admin_headers):
+    created = (await api.post("/api/experiences", headers=admin_headers, json=experience_payload(**CATALOG[0]))).json()
+    assert await search(api, "kalamkri") == [(created["id"], "Kalamkari Painting Workshop")]
+
+    await api.put(f"/api/experiences/{created['id']}", headers=admin_headers, json={"title": "Pedana Block Printing"})
+    assert await search(api, "block print") == [(created["id"], "Pedana Block Printing")]
+    suggestions = (await api.get("/api/experiences/suggest", params={"q": "pedan"})).json()
+    assert suggestions == [{"id": created["id"], "title": "Pedana Block Printing"}]
+
+    await api.delete(f"/api/experiences/{created['id']}", headers=admin_headers)
+    assert await search(api, "pedana") == []
+
+async def test_search_index_expires_without_a_change_stream(api, db, monkeypatch):
+    # Writes straight to the database stand in for another worker's admin edits
+    await db.experiences.insert_one({**experience_payload(title="Bobbili Veena Workshop"), "id": 1, "rating": 4.5})
+    assert await search(api, "veena") == []
+
+    monkeypatch.setattr(server, "search_index_built", server.search_index_built - server.CATALOG_CACHE_TTL - 1)
+    assert await search(api, "veena") == [(1, "Bobbili Veena Workshop")]
+
+    await db.experiences.delete_one({"id": 1})
+    assert await search(api, "veena") == [(1, "Bobbili Veena Workshop")]
+    monkeypatch.setattr(server, "CATALOG_CACHE_TTL", 0)
+    assert await search(api, "veena") == []
+    suggestions = await api.get("/api/experiences/suggest", params={"q": "veen"})
+    assert suggestions.json() == []